@@ -0,0 +1,21 @@
+import os
+import sys
+
+EXAMPLE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "example")
+
+
+def setup_django():
+    """
+    Configure Django with the example project and create an empty in-memory test database to run benchmarks against.
+    """
+    import django
+
+    sys.path.insert(0, EXAMPLE_DIR)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "example.settings")
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
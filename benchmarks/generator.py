@@ -0,0 +1,71 @@
+"""
+Deterministic synthetic glossaries and pages for the benchmarks. The same options and seed always generate the same
+terms, tags and pages.
+"""
+import random
+
+WORDS = (
+    "account balance cache client cluster column commit compiler context cursor database deploy domain driver "
+    "endpoint engine entity event field filter format gateway graph handler header index instance kernel key "
+    "latency layer ledger library limit loader matrix memory message metric module network node object offset "
+    "package parser payload pipeline pointer policy process protocol proxy query queue record registry replica "
+    "request resource router runtime schema scope segment server service session shard signal socket stack "
+    "storage stream syntax table thread token trace transaction tree variable vector version volume worker"
+).split()
+
+
+def generate_words(rng, count):
+    return " ".join(rng.choice(WORDS) for _ in range(count))
+
+
+def generate_term_rows(terms=1000, tags=50, tags_per_term=3, definition_words=40, seed=0):
+    """
+    Yield rows for `TermImporter` with unique term names, definitions of about `definition_words` words and
+    `tags_per_term` tags out of `tags` tags each.
+    """
+    rng = random.Random(seed)
+    tag_names = [f"tag {i}" for i in range(tags)]
+    for i in range(terms):
+        # the number keeps names unique and within the 25 character limit of Term.term
+        name = f"{rng.choice(WORDS)} {i}"
+        paragraphs = [
+            generate_words(rng, max(1, definition_words // 2)),
+            generate_words(rng, max(1, definition_words - definition_words // 2)),
+        ]
+        yield {
+            "term": name,
+            "definition": "".join(f"<p>{paragraph}</p>" for paragraph in paragraphs),
+            "tags": rng.sample(tag_names, min(tags_per_term, tags)),
+            "live": True,
+        }
+
+
+def create_glossary(**options):
+    """
+    Create a glossary in the database with the bulk importer, which also adds it to the search index.
+    Return the ids of the created terms.
+    """
+    from wagtailterms.importexport import TermImporter
+    from wagtailterms.models import Term
+
+    TermImporter().import_terms(generate_term_rows(**options))
+    return list(Term.objects.order_by("pk").values_list("pk", flat=True))
+
+
+def generate_pages(term_ids, pages=20, terms_per_page=50, words_between_terms=20, seed=0):
+    """
+    Return the rich text html of pages that each link `terms_per_page` terms, as saved by the editor.
+    """
+    rng = random.Random(seed)
+    html_pages = []
+    for _ in range(pages):
+        paragraphs = []
+        for _ in range(terms_per_page):
+            term_id = rng.choice(term_ids)
+            paragraphs.append(
+                f'<p>{generate_words(rng, words_between_terms)} '
+                f'<span data-term="{term_id}">{rng.choice(WORDS)}</span> '
+                f'{generate_words(rng, words_between_terms)}</p>'
+            )
+        html_pages.append("".join(paragraphs))
+    return html_pages
@@ -0,0 +1,239 @@
+"""
+Time the terms api, serializer and editor conversion against a synthetic glossary and write the results as json, so
+that runs can be compared between commits.
+
+Usage, from the repository root:
+    python -m benchmarks.run --terms 10000 --output results.json
+    python -m benchmarks.run --scenario search --scenario tag_filter
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks import setup_django
+from benchmarks.generator import create_glossary, generate_pages
+
+SCENARIOS = {}
+
+
+def scenario(function):
+    """
+    Register a scenario. A scenario takes the benchmark context and returns the function that is timed.
+    """
+    SCENARIOS[function.__name__] = function
+    return function
+
+
+@scenario
+def list_first_page(context):
+    client, url = context["client"], context["list_url"]
+    return lambda: client.get(url, {"page_size": 100})
+
+
+@scenario
+def list_last_page(context):
+    client, url = context["client"], context["list_url"]
+    last_page = max(1, -(-context["options"].terms // 100))
+    return lambda: client.get(url, {"page_size": 100, "page": last_page})
+
+
+@scenario
+def list_cursor(context):
+    client, url = context["client"], context["list_url"]
+    return lambda: client.get(url, {"page_size": 100, "pagination": "cursor"})
+
+
+@scenario
+def list_excerpts(context):
+    client, url = context["client"], context["list_url"]
+    return lambda: client.get(url, {"page_size": 100, "definition": "excerpt"})
+
+
+@scenario
+def search(context):
+    client, url = context["client"], context["list_url"]
+    return lambda: client.get(url, {"page_size": 100, "q": "cache"})
+
+
+@scenario
+def tag_filter(context):
+    client, url = context["client"], context["list_url"]
+    return lambda: client.get(url, {"page_size": 100, "tags": ["tag 0", "tag 1", "tag 2"], "tag_mode": "any"})
+
+
+@scenario
+def tags_pagination(context):
+    """
+    Page through every tag with the cursor, like the tag filter in the editor does when scrolling.
+    """
+    client, url = context["staff_client"], context["tags_url"]
+
+    def run():
+        cursor = None
+        while True:
+            data = client.get(url, {"cursor": cursor} if cursor else {}).json()
+            cursor = data["next"]
+            if not cursor:
+                break
+
+    return run
+
+
+@scenario
+def detail(context):
+    from django.urls import reverse
+
+    client = context["client"]
+    urls = [reverse("wagtailterms:terms-detail", args=[term_id]) for term_id in context["term_ids"][:100]]
+    return lambda: [client.get(url) for url in urls]
+
+
+@scenario
+def serializer(context):
+    """
+    Serialize a page of terms with their definitions rendered from scratch.
+    """
+    from wagtailterms.cache import definition_cache, get_cache
+    from wagtailterms.models import Term
+    from wagtailterms.serializers import TermSerializer
+
+    def run():
+        definition_cache.clear()
+        get_cache().clear()
+        terms = Term.objects.filter(pk__in=context["term_ids"][:100]).prefetch_related("tags")
+        return TermSerializer(terms, many=True).data
+
+    return run
+
+
+@scenario
+def editor_from_html(context):
+    converter = context["converter"]
+    return lambda: [converter.from_database_format(html) for html in context["pages"]]
+
+
+@scenario
+def editor_to_html(context):
+    converter = context["converter"]
+    contentstates = [converter.from_database_format(html) for html in context["pages"]]
+    return lambda: [converter.to_database_format(contentstate) for contentstate in contentstates]
+
+
+def time_scenario(function, repeats):
+    """
+    Run a scenario once to warm up and count its queries, then return its timings over `repeats` runs.
+    """
+    from django.db import connection
+
+    queries = 0
+
+    # counted with a wrapper because the query log is cleared at the start of every request
+    def count_query(execute, sql, params, many, context):
+        nonlocal queries
+        queries += 1
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(count_query):
+        function()
+
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        "median_ms": round(statistics.median(timings), 3),
+        "min_ms": round(min(timings), 3),
+        "max_ms": round(max(timings), 3),
+        "repeats": repeats,
+        "queries": queries,
+    }
+
+
+def get_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--terms", type=int, default=5000)
+    parser.add_argument("--tags", type=int, default=200)
+    parser.add_argument("--tags-per-term", type=int, default=3)
+    parser.add_argument("--definition-words", type=int, default=40)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--terms-per-page", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Only run these scenarios")
+    parser.add_argument("--output", help="Write the results to this json file")
+    options = parser.parse_args(argv)
+
+    setup_django()
+
+    import django
+    import wagtail
+    from django.db import connection
+    from django.contrib.auth import get_user_model
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+    from wagtail.admin.rich_text.converters.contentstate import ContentstateConverter
+
+    start = time.perf_counter()
+    term_ids = create_glossary(
+        terms=options.terms,
+        tags=options.tags,
+        tags_per_term=options.tags_per_term,
+        definition_words=options.definition_words,
+        seed=options.seed,
+    )
+    setup_ms = (time.perf_counter() - start) * 1000
+
+    staff_client = APIClient()
+    staff_client.force_authenticate(get_user_model().objects.create_superuser("benchmark", password="benchmark"))
+    context = {
+        "options": options,
+        "term_ids": term_ids,
+        "pages": generate_pages(term_ids, options.pages, options.terms_per_page, seed=options.seed),
+        "client": APIClient(),
+        "staff_client": staff_client,
+        "list_url": reverse("wagtailterms:terms-list"),
+        "tags_url": reverse("wagtailterms:terms-tags"),
+        "converter": ContentstateConverter(features=["bold", "italic", "link", "term"]),
+    }
+
+    results = {}
+    for name in options.scenario or SCENARIOS:
+        results[name] = time_scenario(SCENARIOS[name](context), options.repeats)
+        print(
+            f"{name:<18} {results[name]['median_ms']:>10.2f}ms median {results[name]['queries']:>5} queries",
+            file=sys.stderr,
+        )
+
+    report = {
+        "commit": get_commit(),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "wagtail": wagtail.__version__,
+        "database": connection.vendor,
+        "options": {key: value for key, value in vars(options).items() if key not in ("output", "scenario")},
+        "setup_ms": round(setup_ms, 3),
+        "results": results,
+    }
+    if options.output:
+        with open(options.output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
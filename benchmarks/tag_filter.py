@@ -0,0 +1,75 @@
+"""
+Compare how long it takes to filter terms by a growing number of tags with one join per tag,
+and with the single grouped subquery used by TermViewSet.
+
+Usage, from the repository root:
+    python -m benchmarks.tag_filter
+"""
+import random
+import statistics
+import time
+
+from benchmarks import setup_django
+
+TERMS = 5000
+TAGS = 40
+TAGS_PER_TERM = 8
+REPEATS = 5
+
+
+def create_terms():
+    from taggit.models import Tag
+    from wagtailterms.models import Term, WagtailTermTag
+
+    rng = random.Random(0)
+    tags = Tag.objects.bulk_create([Tag(name=f"tag{i}", slug=f"tag{i}") for i in range(TAGS)])
+    terms = Term.objects.bulk_create([
+        Term(term=f"term {i}", definition=f"<p>definition {i}</p>", live=True) for i in range(TERMS)
+    ])
+    tagged_terms = []
+    for i, term in enumerate(terms):
+        term_tags = set(rng.sample(tags, TAGS_PER_TERM))
+        if i % 10 == 0:
+            # some terms have all of the first tags so that every query has results to return
+            term_tags.update(tags[:16])
+        tagged_terms += [WagtailTermTag(content_object=term, tag=tag) for tag in term_tags]
+    WagtailTermTag.objects.bulk_create(tagged_terms)
+    return tags
+
+
+def time_query(queryset):
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        list(queryset.values_list("id", flat=True))
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    setup_django()
+
+    from django.test import RequestFactory
+    from rest_framework.request import Request
+    from wagtailterms.models import Term
+    from wagtailterms.views import TermViewSet
+
+    tags = create_terms()
+    print(f"{TERMS} terms, {TAGS} tags, {TAGS_PER_TERM} tags per term, median of {REPEATS} runs")
+    print(f"{'tags':>4}  {'join per tag':>12}  {'subquery':>12}")
+    for tag_count in [1, 2, 4, 8, 12, 16]:
+        tag_ids = [tag.id for tag in tags[:tag_count]]
+
+        joined = Term.objects.filter(live=True)
+        for tag_id in tag_ids:
+            joined = joined.filter(tags=tag_id)
+
+        view = TermViewSet()
+        view.request = Request(RequestFactory().get("/"))
+        grouped = Term.objects.filter(live=True, id__in=view.get_tagged_term_ids(tag_ids))
+
+        print(f"{tag_count:>4}  {time_query(joined) * 1000:>10.2f}ms  {time_query(grouped) * 1000:>10.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 import os
 
-from setuptools import setup
+from setuptools import find_packages, setup
 from os import path
 
 install_requires = [
@@ -22,7 +22,7 @@ setup(
         url="https://github.com/smark-1/wagtailterms/",
         download_url="https://pypi.python.org/pypi/wagtailterms",
         license="MIT",
-        packages=["wagtailterms"],
+        packages=find_packages(include=["wagtailterms", "wagtailterms.*"]),
         install_requires=install_requires,
         include_package_data=True,
         keywords=[
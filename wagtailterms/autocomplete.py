@@ -0,0 +1,117 @@
+import re
+import threading
+from bisect import bisect_left
+
+from .cache import TERM_NAMES_VERSION_CACHE_KEY, bump_version, get_version
+from .models import Term
+
+WORD_START_RE = re.compile(r"\b\w")
+
+
+class PrefixIndex:
+    """
+    Sorted arrays of live term names for instant prefix lookups.
+
+    Terms are found by the start of their name, and then by the start of any other word in their name,
+    so "special" and "term" both find "Special Term".
+    """
+
+    def __init__(self, terms=(), version=None):
+        self.version = version
+        self.names = {}
+        self.name_keys = []
+        self.word_keys = []
+        for term_id, name in terms:
+            self.names[term_id] = name
+            self.name_keys.append((name.casefold(), term_id))
+            self.word_keys.extend(self.get_word_keys(term_id, name))
+        self.name_keys.sort()
+        self.word_keys.sort()
+
+    @staticmethod
+    def get_word_keys(term_id, name):
+        # the rest of the name from the start of every word after the first one
+        name = name.casefold()
+        return [(name[match.start():], term_id) for match in WORD_START_RE.finditer(name) if match.start() > 0]
+
+    def add(self, term_id, name):
+        self.remove(term_id)
+        self.names[term_id] = name
+        self.insert(self.name_keys, (name.casefold(), term_id))
+        for key in self.get_word_keys(term_id, name):
+            self.insert(self.word_keys, key)
+
+    def remove(self, term_id):
+        name = self.names.pop(term_id, None)
+        if name is None:
+            return
+        self.delete(self.name_keys, (name.casefold(), term_id))
+        for key in self.get_word_keys(term_id, name):
+            self.delete(self.word_keys, key)
+
+    @staticmethod
+    def insert(keys, key):
+        keys.insert(bisect_left(keys, key), key)
+
+    @staticmethod
+    def delete(keys, key):
+        position = bisect_left(keys, key)
+        if position < len(keys) and keys[position] == key:
+            del keys[position]
+
+    def search(self, prefix, limit=10):
+        """
+        Return up to `limit` (id, name) pairs of the terms with a word starting with `prefix`,
+        terms whose name starts with the prefix first.
+        """
+        prefix = prefix.casefold().strip()
+        if not prefix:
+            return []
+
+        results = {}
+        for keys in (self.name_keys, self.word_keys):
+            position = bisect_left(keys, (prefix,))
+            while position < len(keys) and len(results) < limit:
+                key, term_id = keys[position]
+                if not key.startswith(prefix):
+                    break
+                results.setdefault(term_id, self.names[term_id])
+                position += 1
+        return list(results.items())
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_prefix_index():
+    """
+    Return the prefix index of live terms, building it the first time it is used and rebuilding it when terms were
+    changed by another process.
+    """
+    global _index
+    version = get_version(TERM_NAMES_VERSION_CACHE_KEY)
+    with _index_lock:
+        if _index is None or _index.version != version:
+            _index = PrefixIndex(Term.objects.filter(live=True).values_list("id", "term"), version)
+        return _index
+
+
+def update_prefix_index(term_id):
+    """
+    Update the prefix index of this process from the live row of a term after it was saved or deleted, and start a
+    new version so that other processes rebuild theirs.
+    """
+    # read from the database because the term that was saved can hold an unpublished draft
+    name = Term.objects.filter(pk=term_id, live=True).values_list("term", flat=True).first()
+    previous_version = get_version(TERM_NAMES_VERSION_CACHE_KEY)
+    version = bump_version(TERM_NAMES_VERSION_CACHE_KEY)
+    with _index_lock:
+        # an index that missed earlier changes is rebuilt the next time it is used instead
+        if _index is None or _index.version != previous_version:
+            return
+        if name is None:
+            _index.remove(term_id)
+        else:
+            _index.add(term_id, name)
+        _index.version = version
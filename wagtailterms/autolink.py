@@ -0,0 +1,212 @@
+import html
+import re
+import threading
+from collections import deque
+
+from django.utils.html import format_html
+
+from .cache import TERM_NAMES_VERSION_CACHE_KEY, get_version
+from .models import Term
+from .utils import extract_term_ids, render_term_start_tag
+
+# tags and comments in a string of html, everything between them is text
+TAG_RE = re.compile(r"<!--.*?-->|<[^>]*>", re.DOTALL)
+TAG_NAME_RE = re.compile(r"<\s*(/?)\s*([a-zA-Z0-9]+)")
+
+# text inside these elements is never linked
+SKIPPED_ELEMENTS = {"a", "button", "code", "pre", "script", "style", "textarea"}
+
+# room for every unicode code point when packing a state and a character into one transition key
+CHAR_BITS = 21
+
+
+def fold_case(text):
+    """
+    Lowercase text without changing its length, so that positions in the folded text match the original.
+    """
+    folded = text.lower()
+    if len(folded) == len(text):
+        return folded
+    return "".join(char if len(char.lower()) != 1 else char.lower() for char in text)
+
+
+def is_word_char(char):
+    return char.isalnum() or char == "_"
+
+
+class TermMatcher:
+    """
+    An Aho-Corasick automaton over term names that finds every term in a text in one pass, however many terms
+    there are.
+    """
+
+    def __init__(self, terms=(), version=None):
+        self.version = version
+        # (state << CHAR_BITS) | ord(char) -> next state, one flat dict keeps the automaton compact
+        self.transitions = {}
+        self.fail = [0]
+        # (term id, length) of the term ending at each state
+        self.output = [None]
+        # the closest state along the fail links with an output, so shorter terms ending at the same place are found
+        self.output_link = [0]
+
+        children = [[]]
+        for term_id, name in terms:
+            name = fold_case(name.strip())
+            if not name:
+                continue
+            state = 0
+            for char in name:
+                key = (state << CHAR_BITS) | ord(char)
+                next_state = self.transitions.get(key)
+                if next_state is None:
+                    next_state = len(self.fail)
+                    self.transitions[key] = next_state
+                    self.fail.append(0)
+                    self.output.append(None)
+                    self.output_link.append(0)
+                    children.append([])
+                    children[state].append((char, next_state))
+                state = next_state
+            if self.output[state] is None:
+                self.output[state] = (term_id, len(name))
+
+        # breadth first so that the fail links of shorter prefixes are known before longer ones
+        queue = deque(child for _, child in children[0])
+        while queue:
+            state = queue.popleft()
+            for char, child in children[state]:
+                fail = self.fail[state]
+                while fail and ((fail << CHAR_BITS) | ord(char)) not in self.transitions:
+                    fail = self.fail[fail]
+                fail = self.transitions.get((fail << CHAR_BITS) | ord(char), 0)
+                self.fail[child] = fail
+                self.output_link[child] = fail if self.output[fail] is not None else self.output_link[fail]
+                queue.append(child)
+
+    def find(self, text):
+        """
+        Return (start, end, term id) for the terms found in text as whole words. Overlapping matches are resolved by
+        keeping the leftmost, then longest, match.
+        """
+        folded = fold_case(text)
+        transitions = self.transitions
+        fail = self.fail
+        output = self.output
+        output_link = self.output_link
+
+        matches = []
+        state = 0
+        for position, char in enumerate(folded):
+            code = ord(char)
+            while state and ((state << CHAR_BITS) | code) not in transitions:
+                state = fail[state]
+            state = transitions.get((state << CHAR_BITS) | code, 0)
+
+            found = state if output[state] is not None else output_link[state]
+            while found:
+                term_id, length = output[found]
+                start = position - length + 1
+                end = position + 1
+                if (start == 0 or not is_word_char(text[start - 1])) and (
+                    end == len(text) or not is_word_char(text[end])
+                ):
+                    matches.append((start, end, term_id))
+                found = output_link[found]
+
+        matches.sort(key=lambda match: (match[0], -match[1]))
+        selected = []
+        last_end = 0
+        for start, end, term_id in matches:
+            if start >= last_end:
+                selected.append((start, end, term_id))
+                last_end = end
+        return selected
+
+
+_matcher = None
+_matcher_lock = threading.Lock()
+
+
+def get_term_matcher():
+    """
+    Return the matcher for the names of the live terms, rebuilding it when a term changed.
+    """
+    global _matcher
+    version = get_version(TERM_NAMES_VERSION_CACHE_KEY)
+    with _matcher_lock:
+        if _matcher is None or _matcher.version != version:
+            _matcher = TermMatcher(Term.objects.filter(live=True).values_list("id", "term"), version)
+        return _matcher
+
+
+def render_term(term_id, text):
+    """
+    Render the same `<span data-term>` markup that is saved by the editor.
+    """
+    return format_html('{}{}</span>', render_term_start_tag(term_id), text)
+
+
+def autolink_html(value, first_only=True, matcher=None):
+    """
+    Wrap the occurrences of live term names in a string of html with term spans.
+
+    Text inside links, existing terms and code is left alone. With `first_only`, a term is only linked the first
+    time it appears, and not at all if the html already links to it.
+    """
+    matcher = matcher or get_term_matcher()
+    linked = set()
+    result = []
+    skipped_element = None
+    skipped_depth = 0
+    position = 0
+
+    def link_text(text):
+        if skipped_element or not text.strip():
+            return text
+        unescaped = html.unescape(text)
+        matches = []
+        for match in matcher.find(unescaped):
+            if first_only:
+                if match[2] in linked:
+                    continue
+                linked.add(match[2])
+            matches.append(match)
+        if not matches:
+            return text
+        parts = []
+        last_end = 0
+        for start, end, term_id in matches:
+            parts.append(html.escape(unescaped[last_end:start], quote=False))
+            parts.append(render_term(term_id, unescaped[start:end]))
+            last_end = end
+        parts.append(html.escape(unescaped[last_end:], quote=False))
+        return "".join(parts)
+
+    if first_only:
+        # terms that were already linked by an editor don't need linking again
+        linked.update(extract_term_ids(value))
+
+    for tag in TAG_RE.finditer(value):
+        result.append(link_text(value[position:tag.start()]))
+        result.append(tag.group())
+        position = tag.end()
+
+        name_match = TAG_NAME_RE.match(tag.group())
+        if not name_match:
+            continue
+        closing, name = name_match.group(1), name_match.group(2).lower()
+        self_closing = tag.group().endswith("/>")
+        if skipped_element:
+            if name == skipped_element and not self_closing:
+                skipped_depth += -1 if closing else 1
+                if skipped_depth == 0:
+                    skipped_element = None
+        elif not closing and not self_closing and (
+            name in SKIPPED_ELEMENTS or (name == "span" and "data-term" in tag.group())
+        ):
+            skipped_element = name
+            skipped_depth = 1
+
+    result.append(link_text(value[position:]))
+    return "".join(result)
@@ -0,0 +1,134 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+from wagtail.templatetags.wagtailcore_tags import richtext
+
+from .default_settings import get_setting
+
+
+class LRUCache:
+    """
+    A small thread safe in-process cache that forgets the least recently used keys once it is full.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return default
+            return self._data[key]
+
+    def set(self, key, value):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+definition_cache = LRUCache(get_setting('definition_cache_size'))
+
+
+def get_cache():
+    return caches[get_setting('cache_alias')]
+
+
+def get_definition_cache_key(term_id):
+    return f"wagtailterms:definition:{term_id}"
+
+
+def get_definition_digest(definition):
+    return hashlib.md5((definition or "").encode()).hexdigest()
+
+
+def render_definition(term):
+    """
+    Return the definition of a term rendered with `richtext`.
+
+    Rendered definitions are kept in an in-process LRU in front of the configured Django cache, by term. Both store
+    a digest of the definition they were rendered from, so a process that still has the old rendering of a term in
+    memory renders it again once the term's live definition changes, and changes to other terms or drafts don't
+    render anything again.
+    """
+    key = get_definition_cache_key(term.pk)
+    digest = get_definition_digest(term.definition)
+
+    cached = definition_cache.get(key)
+    if cached is not None and cached[0] == digest:
+        return cached[1]
+
+    cached = get_cache().get(key)
+    if cached is None or cached[0] != digest:
+        cached = (digest, richtext(term.definition))
+        get_cache().set(key, cached, get_setting('definition_cache_timeout'))
+
+    definition_cache.set(key, cached)
+    return cached[1]
+
+
+def invalidate_definition(term_id):
+    key = get_definition_cache_key(term_id)
+    definition_cache.delete(key)
+    get_cache().delete(key)
+
+
+GLOSSARY_VERSION_CACHE_KEY = "wagtailterms:glossary-version"
+# changes whenever a term is saved or deleted, used by the in-memory indexes of term names
+TERM_NAMES_VERSION_CACHE_KEY = "wagtailterms:term-names-version"
+# changes whenever group membership changes, used by the cached tag permission checks
+TAG_GROUPS_VERSION_CACHE_KEY = "wagtailterms:tag-groups-version"
+
+
+def get_version(key):
+    """
+    Return the version stored in the cache under `key`, which is the timestamp of the last change it tracks.
+    """
+    cache = get_cache()
+    version = cache.get(key)
+    if version is None:
+        # nothing is known about earlier changes so start a new version from now
+        cache.add(key, time.time(), None)
+        version = cache.get(key, time.time())
+    return version
+
+
+def bump_version(key):
+    """
+    Start a new version under `key` and return it.
+    """
+    version = time.time()
+    get_cache().set(key, version, None)
+    return version
+
+
+def get_glossary_version():
+    """
+    Return the version of the glossary, which is the timestamp of the last change to any term or tag.
+    """
+    return get_version(GLOSSARY_VERSION_CACHE_KEY)
+
+
+def bump_glossary_version():
+    return bump_version(GLOSSARY_VERSION_CACHE_KEY)
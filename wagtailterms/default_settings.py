@@ -8,7 +8,33 @@ DEFAULT_WAGTAILTERMS_SETTINGS = {
     'menu_order': 200,
     'style': "text-decoration-line: underline; text-decoration-color: green;text-decoration-thickness: "
              "3px;color:green;",
-    'disable_tags': False
+    # 'inline' saves the style on every term span, 'class' saves only the class below and the style is served once
+    # by the stylesheet of the terms api
+    'style_mode': 'inline',
+    # class of the term spans in the 'class' style mode
+    'class_name': 'wagtailterm',
+    'disable_tags': False,
+    # name of the Django cache used to share rendered definitions between processes
+    'cache_alias': 'default',
+    # number of rendered definitions kept in memory by each process
+    'definition_cache_size': 1000,
+    # seconds that rendered definitions are kept in the Django cache
+    'definition_cache_timeout': 60 * 60 * 24,
+    # answer conditional requests to the terms api with 304 Not Modified
+    'conditional_requests': True,
+    # Cache-Control directives added to anonymous api responses, e.g. {'max_age': 60, 's_maxage': 3600}.
+    # When set, publishing, unpublishing or deleting a term also purges its urls from the frontend cache.
+    'cache_control': None,
+    # purge the live pages that link a term from the frontend cache when the term is published, unpublished or deleted
+    'purge_term_pages': False,
+    # pagination of the terms list, 'page' for numbered pages with a count or 'cursor' for cursor pagination
+    'pagination': 'page',
+    # time the phases of terms api requests, and send them in a Server-Timing header and the wagtailterms.timing log
+    'server_timing': False,
+    # users in these groups can use the tags endpoint, as well as staff and superusers
+    'tag_groups': ['Moderators', 'Editors'],
+    # seconds that the group membership of a user is cached for the tags endpoint
+    'tag_groups_cache_timeout': 300,
 }
 
 
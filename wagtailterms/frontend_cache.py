@@ -0,0 +1,71 @@
+from django.contrib.contenttypes.models import ContentType
+from django.urls import reverse
+from wagtail.models import Page, Site
+
+from .models import TermUsage
+
+
+def get_glossary_paths():
+    """
+    Return the paths of the terms api whose responses change when any term changes.
+    """
+    return [
+        reverse("wagtailterms:terms-list"),
+        reverse("wagtailterms:terms-tags"),
+    ]
+
+
+def get_term_paths(term_id):
+    """
+    Return the paths of the terms api whose responses change when the term changes.
+    """
+    return get_glossary_paths() + [reverse("wagtailterms:terms-detail", args=[term_id])]
+
+
+def purge_paths_from_frontend_cache(paths):
+    """
+    Purge the given paths from the frontend cache backends in the `WAGTAILFRONTENDCACHE` setting, on every site.
+    """
+    from wagtail.contrib.frontend_cache.utils import purge_urls_from_cache
+
+    purge_urls_from_cache([
+        site.root_url + path
+        for site in Site.objects.all()
+        for path in paths
+    ])
+
+
+def purge_term_from_frontend_cache(term_id):
+    """
+    Purge the terms api urls of a term from the frontend cache backends.
+    """
+    purge_paths_from_frontend_cache(get_term_paths(term_id))
+
+
+def get_term_pages(term_id):
+    """
+    Return the live pages that link a term, found with the term usage index.
+    """
+    page_ids = TermUsage.objects.filter(
+        term_id=term_id, content_type=ContentType.objects.get_for_model(Page)
+    ).values_list("object_id", flat=True)
+    return Page.objects.live().filter(pk__in=[int(page_id) for page_id in page_ids])
+
+
+def purge_pages_from_frontend_cache(pages):
+    """
+    Purge the given pages from the frontend cache backends.
+    """
+    from wagtail.contrib.frontend_cache.utils import PurgeBatch
+
+    if pages:
+        batch = PurgeBatch()
+        batch.add_pages(pages)
+        batch.purge()
+
+
+def purge_term_pages_from_frontend_cache(term_id):
+    """
+    Purge the live pages that link a term from the frontend cache backends.
+    """
+    purge_pages_from_frontend_cache(get_term_pages(term_id))
@@ -0,0 +1,229 @@
+import csv
+import json
+from collections import defaultdict
+from itertools import islice
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, models, transaction
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.functions import Cast
+from django.utils import timezone
+from taggit.models import Tag
+from taggit.utils import edit_string_for_tags, parse_tags
+from wagtail.models import Revision
+from wagtail.search.backends import get_search_backends
+
+from .cache import TERM_NAMES_VERSION_CACHE_KEY, bump_glossary_version, bump_version
+from .default_settings import get_setting
+from .frontend_cache import get_glossary_paths, purge_paths_from_frontend_cache
+from .models import TagUsage, Term, WagtailTermTag
+from .utils import get_definition_excerpt
+
+FORMATS = ["csv", "jsonl"]
+FIELDS = ["term", "definition", "tags", "live"]
+
+
+def get_format(path, format=None):
+    """
+    Return the format given or the one matching the extension of path.
+    """
+    if format:
+        return format
+    for extension in FORMATS:
+        if str(path).endswith(f".{extension}"):
+            return extension
+    raise ValueError(f"Could not tell the format of {path}, use one of {', '.join(FORMATS)}")
+
+
+def parse_live(value):
+    if isinstance(value, bool):
+        return value
+    if value is None or value == "":
+        return True
+    return str(value).strip().lower() in ("1", "true", "yes")
+
+
+def read_terms(file, format):
+    """
+    Yield a dict with the term, definition, tags and live status for each line of a csv or jsonl file, reading one
+    line at a time.
+    """
+    if format == "csv":
+        rows = csv.DictReader(file)
+        # line 1 is the header
+        numbered = enumerate(rows, start=2)
+    else:
+        numbered = ((number, json.loads(line)) for number, line in enumerate(file, start=1) if line.strip())
+
+    max_length = Term._meta.get_field("term").max_length
+    for number, row in numbered:
+        term = (row.get("term") or "").strip()
+        if not term:
+            raise ValueError(f"Line {number} has no term")
+        if len(term) > max_length:
+            raise ValueError(f"Line {number}: term {term!r} is longer than {max_length} characters")
+        tags = row.get("tags") or []
+        if isinstance(tags, str):
+            tags = parse_tags(tags)
+        yield {
+            "term": term,
+            "definition": row.get("definition") or "",
+            "tags": [str(tag) for tag in tags],
+            "live": parse_live(row.get("live")),
+        }
+
+
+def export_terms(file, format, live_only=False, chunk_size=2000):
+    """
+    Write every term to a csv or jsonl file in the format read by `read_terms`, fetching the terms and their tags
+    from the database in chunks so that memory use doesn't grow with the size of the glossary. Return the number of
+    terms written.
+    """
+    writer = None
+    if format == "csv":
+        writer = csv.DictWriter(file, fieldnames=FIELDS)
+        writer.writeheader()
+
+    terms = Term.objects.order_by("pk").values_list("pk", "term", "definition", "live")
+    if live_only:
+        terms = terms.filter(live=True)
+    terms = terms.iterator(chunk_size=chunk_size)
+
+    count = 0
+    while chunk := list(islice(terms, chunk_size)):
+        # one query for the tags of the chunk, prefetching the cluster tag manager is much slower
+        tags = defaultdict(list)
+        tagged_terms = WagtailTermTag.objects.filter(
+            content_object_id__in=[term[0] for term in chunk]
+        ).order_by("tag__name").values_list("content_object_id", "tag__name")
+        for term_id, name in tagged_terms:
+            tags[term_id].append(name)
+
+        for pk, term, definition, live in chunk:
+            row = {"term": term, "definition": definition, "tags": tags[pk], "live": live}
+            if writer:
+                row["tags"] = edit_string_for_tags([Tag(name=name) for name in tags[pk]])
+                writer.writerow(row)
+            else:
+                file.write(json.dumps(row) + "\n")
+        count += len(chunk)
+    return count
+
+
+class TermImporter:
+    """
+    Create terms in batches with a constant number of queries per batch, instead of saving each term with its own
+    revision, tag and search index queries.
+
+    Bulk inserts skip the model signals, so the caches they keep up to date are refreshed once by `finish`.
+    """
+
+    def __init__(self, batch_size=1000, create_revisions=False, update_index=True):
+        self.batch_size = batch_size
+        self.create_revisions = create_revisions
+        self.update_index = update_index
+        # tag name -> tag id, for every tag seen so far
+        self.tag_ids = {}
+        # ids of the tags given to imported terms, whose usage is recounted at the end
+        self.used_tag_ids = set()
+        self.count = 0
+
+    def import_terms(self, rows):
+        """
+        Import the rows from `read_terms` and return the number of terms created.
+        """
+        rows = iter(rows)
+        while True:
+            batch = list(islice(rows, self.batch_size))
+            if not batch:
+                break
+            self.import_batch(batch)
+        self.finish()
+        return self.count
+
+    def get_tag_ids(self, names):
+        missing = {name for name in names if name not in self.tag_ids}
+        if missing:
+            self.tag_ids.update(Tag.objects.filter(name__in=missing).values_list("name", "id"))
+            missing -= self.tag_ids.keys()
+        if missing:
+            Tag.objects.bulk_create(
+                [Tag(name=name, slug=Tag().slugify(name)) for name in missing], ignore_conflicts=True
+            )
+            self.tag_ids.update(Tag.objects.filter(name__in=missing).values_list("name", "id"))
+            # tags whose slug is taken by another tag get a numbered slug when saved one by one
+            for name in missing - self.tag_ids.keys():
+                self.tag_ids[name] = Tag.objects.create(name=name).id
+        return [self.tag_ids[name] for name in names]
+
+    @transaction.atomic
+    def import_batch(self, batch):
+        now = timezone.now()
+        terms = [
+            Term(
+                term=row["term"],
+                definition=row["definition"],
+                # bulk_create doesn't call save, which keeps the excerpt up to date
+                excerpt=get_definition_excerpt(row["definition"]),
+                live=row["live"],
+                has_unpublished_changes=not row["live"],
+                first_published_at=now if row["live"] else None,
+                last_published_at=now if row["live"] else None,
+            )
+            for row in batch
+        ]
+        if connection.features.can_return_rows_from_bulk_insert:
+            Term.objects.bulk_create(terms)
+        else:
+            # the tags are linked by the ids of the new terms, which bulk_create doesn't set on every database, e.g.
+            # MySQL, and names aren't unique so they can't be selected again
+            for term in terms:
+                term.save()
+
+        self.used_tag_ids.update(self.get_tag_ids({name for row in batch for name in row["tags"]}))
+        WagtailTermTag.objects.bulk_create([
+            WagtailTermTag(content_object_id=term.pk, tag_id=self.tag_ids[name])
+            for term, row in zip(terms, batch)
+            for name in dict.fromkeys(row["tags"])
+        ])
+
+        if self.create_revisions or self.update_index:
+            # fetch the batch again with its tags, which revisions and the search index both read
+            terms = list(
+                Term.get_indexed_objects().filter(pk__in=[term.pk for term in terms]).prefetch_related("tagged_terms")
+            )
+        if self.create_revisions:
+            self.create_revisions_for(terms, now)
+        if self.update_index:
+            for backend in get_search_backends(with_auto_update=True):
+                backend.add_bulk(Term, terms)
+        self.count += len(terms)
+
+    def create_revisions_for(self, terms, now):
+        content_type = ContentType.objects.get_for_model(Term)
+        Revision.objects.bulk_create([
+            Revision(
+                content_type=content_type,
+                base_content_type=content_type,
+                object_id=str(term.pk),
+                created_at=now,
+                content=term.serializable_data(),
+                object_str=str(term),
+            )
+            for term in terms
+        ])
+        # two updates for the whole batch, bulk_update would build a CASE with a branch for every term
+        batch = Term.objects.filter(pk__in=[term.pk for term in terms])
+        batch.update(latest_revision=Subquery(
+            Revision.objects.filter(
+                content_type=content_type, object_id=Cast(OuterRef("pk"), models.CharField())
+            ).values("pk")[:1]
+        ))
+        batch.filter(live=True).update(live_revision=F("latest_revision"))
+
+    def finish(self):
+        TagUsage.update_for_tags(self.used_tag_ids)
+        bump_glossary_version()
+        bump_version(TERM_NAMES_VERSION_CACHE_KEY)
+        if get_setting('cache_control'):
+            purge_paths_from_frontend_cache(get_glossary_paths())
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from wagtailterms.importexport import FORMATS, export_terms, get_format
+
+
+class Command(BaseCommand):
+    help = "Write every term to a csv or jsonl file that can be loaded with wagtailterms_import"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", "-o", help="The file to write to, defaults to stdout")
+        parser.add_argument("--format", choices=FORMATS, help="Defaults to the extension of the output file, or csv")
+        parser.add_argument("--live", action="store_true", help="Only export live terms")
+        parser.add_argument(
+            "--chunk-size", type=int, default=2000, help="The number of terms fetched from the database at a time"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            format = get_format(options["output"], options["format"]) if options["output"] else options["format"] or "csv"
+        except ValueError as e:
+            raise CommandError(e)
+
+        if options["output"]:
+            with open(options["output"], "w", newline="", encoding="utf-8") as file:
+                count = export_terms(file, format, options["live"], options["chunk_size"])
+            if options["verbosity"] > 0:
+                self.stdout.write(f"Exported {count} terms to {options['output']}")
+        else:
+            export_terms(self.stdout, format, options["live"], options["chunk_size"])
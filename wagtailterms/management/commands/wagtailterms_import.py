@@ -0,0 +1,48 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from wagtailterms.importexport import FORMATS, TermImporter, get_format, read_terms
+
+
+class Command(BaseCommand):
+    help = "Create terms from a csv or jsonl file in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="The file to import, or - to read from stdin")
+        parser.add_argument("--format", choices=FORMATS, help="Defaults to the extension of the file")
+        parser.add_argument("--batch-size", type=int, default=1000, help="The number of terms created at a time")
+        parser.add_argument(
+            "--revisions", action="store_true", help="Create a revision for each term, as saving it in the admin does"
+        )
+        parser.add_argument(
+            "--no-index", action="store_false", dest="update_index",
+            help="Don't add the terms to the search index, e.g. when running update_index afterwards",
+        )
+
+    def handle(self, *args, **options):
+        if options["path"] == "-" and not options["format"]:
+            raise CommandError("--format is required when reading from stdin")
+        try:
+            format = get_format(options["path"], options["format"])
+        except ValueError as e:
+            raise CommandError(e)
+
+        importer = TermImporter(
+            batch_size=options["batch_size"],
+            create_revisions=options["revisions"],
+            update_index=options["update_index"],
+        )
+        start = time.monotonic()
+        try:
+            file = sys.stdin if options["path"] == "-" else open(options["path"], newline="", encoding="utf-8")
+        except OSError as e:
+            raise CommandError(f"Could not open {options['path']}: {e.strerror}")
+        try:
+            with file:
+                count = importer.import_terms(read_terms(file, format))
+        except ValueError as e:
+            raise CommandError(f"{e}. {importer.count} terms were imported before the error")
+        if options["verbosity"] > 0:
+            self.stdout.write(f"Imported {count} terms in {time.monotonic() - start:.1f}s")
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from wagtailterms.models import TagUsage
+
+
+class Command(BaseCommand):
+    help = "Recount the number of live terms using each tag for the tags endpoint"
+
+    def handle(self, *args, **options):
+        TagUsage.update_for_tags()
+        if options["verbosity"] > 0:
+            self.stdout.write(f"Counted the usage of {TagUsage.objects.count()} tags")
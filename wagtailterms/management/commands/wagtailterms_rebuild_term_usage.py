@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from wagtailterms.usage import rebuild_term_usage
+
+
+class Command(BaseCommand):
+    help = "Rebuild the index of the live pages and snippets that link each term"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=500, help="The number of rows loaded and saved at a time"
+        )
+
+    def handle(self, *args, **options):
+        count = rebuild_term_usage(options["batch_size"])
+        if options["verbosity"] > 0:
+            self.stdout.write(f"Indexed {count} term usages")
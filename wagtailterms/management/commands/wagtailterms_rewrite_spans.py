@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from wagtailterms.restyle import SpanRewriter
+
+
+class Command(BaseCommand):
+    help = (
+        "Rewrite the term spans saved in rich text, StreamField and revision content to match the current "
+        "style_mode, style and class_name settings"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=500, help="The number of rows loaded and saved at a time"
+        )
+        parser.add_argument("--no-revisions", action="store_true", help="Leave the content of revisions alone")
+        parser.add_argument("--dry-run", action="store_true", help="Count the rows that would change without saving")
+
+    def handle(self, *args, **options):
+        counts = SpanRewriter(
+            batch_size=options["batch_size"],
+            revisions=not options["no_revisions"],
+            dry_run=options["dry_run"],
+        ).rewrite()
+        if options["verbosity"] > 0:
+            verb = "Would rewrite" if options["dry_run"] else "Rewrote"
+            for label, count in counts.items():
+                self.stdout.write(f"{verb} the term spans of {count} {label} rows")
+            if not counts:
+                self.stdout.write("No term spans needed rewriting")
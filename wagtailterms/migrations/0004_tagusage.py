@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def count_tag_usage(apps, schema_editor):
+    WagtailTermTag = apps.get_model('wagtailterms', 'WagtailTermTag')
+    TagUsage = apps.get_model('wagtailterms', 'TagUsage')
+
+    counts = WagtailTermTag.objects.filter(content_object__live=True).values('tag_id', 'tag__name').annotate(
+        usage_count=models.Count('id')
+    )
+    TagUsage.objects.bulk_create([
+        TagUsage(tag_id=count['tag_id'], name=count['tag__name'], usage_count=count['usage_count'])
+        for count in counts
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taggit', '0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx'),
+        ('wagtailterms', '0003_alter_term_options'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TagUsage',
+            fields=[
+                ('tag', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='wagtailterms_usage', serialize=False, to='taggit.tag')),
+                ('name', models.CharField(max_length=100)),
+                ('usage_count', models.PositiveIntegerField(db_index=True)),
+            ],
+        ),
+        migrations.RunPython(count_tag_usage, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taggit', '0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx'),
+        ('wagtailterms', '0004_tagusage'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tagusage',
+            name='usage_count',
+            field=models.PositiveIntegerField(),
+        ),
+        migrations.AddIndex(
+            model_name='tagusage',
+            index=models.Index(fields=['-usage_count', 'name'], name='wagtailterms_tagusage_order'),
+        ),
+    ]
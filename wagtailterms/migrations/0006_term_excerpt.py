@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:48
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+from wagtail.rich_text import get_text_for_indexing
+
+
+def get_definition_excerpt(definition):
+    # a copy of wagtailterms.utils.get_definition_excerpt as it was when this migration was written, so that later
+    # changes to it don't change what this migration does
+    return Truncator(get_text_for_indexing(definition or "")).chars(150)
+
+
+def fill_excerpts(apps, schema_editor):
+    Term = apps.get_model('wagtailterms', 'Term')
+
+    terms = []
+    for term in Term.objects.only('id', 'definition').iterator(chunk_size=1000):
+        term.excerpt = get_definition_excerpt(term.definition)
+        terms.append(term)
+        if len(terms) == 1000:
+            Term.objects.bulk_update(terms, ['excerpt'])
+            terms = []
+    Term.objects.bulk_update(terms, ['excerpt'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wagtailterms', '0005_tagusage_order'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='term',
+            name='excerpt',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('wagtailterms', '0006_term_excerpt'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TermUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.CharField(max_length=255)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='contenttypes.contenttype')),
+                ('term', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='usages', to='wagtailterms.term')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['content_type', 'object_id'], name='wagtailterms_termusage_object')],
+                'constraints': [models.UniqueConstraint(fields=('term', 'content_type', 'object_id'), name='wagtailterms_termusage_unique')],
+            },
+        ),
+    ]
@@ -1,12 +1,15 @@
-from django.db import models
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, models, transaction
 from wagtail.fields import RichTextField
 from wagtail.models import DraftStateMixin, RevisionMixin, LockableMixin
 from wagtail.search import index
 from modelcluster.fields import ParentalKey
 from modelcluster.contrib.taggit import ClusterTaggableManager
-from taggit.models import TaggedItemBase
+from taggit.models import Tag, TaggedItemBase
 from modelcluster.models import ClusterableModel
 
+from .utils import get_base_content_type, get_definition_excerpt
+
 class WagtailTermTag(TaggedItemBase):
     content_object = ParentalKey('wagtailterms.Term', on_delete=models.CASCADE, related_name='tagged_terms')
 
@@ -14,6 +17,8 @@ class WagtailTermTag(TaggedItemBase):
 class Term(index.Indexed, DraftStateMixin, RevisionMixin, LockableMixin, ClusterableModel):
     term = models.CharField(max_length=25)
     definition = RichTextField()
+    # plain text start of the definition, kept up to date on save so that lists don't need to render the definition
+    excerpt = models.TextField(blank=True, editable=False)
     tags = ClusterTaggableManager(through=WagtailTermTag, blank=True)
 
     search_fields = [
@@ -22,6 +27,9 @@ class Term(index.Indexed, DraftStateMixin, RevisionMixin, LockableMixin, Cluster
         index.SearchField("definition",boost=1),
 
         index.FilterField("live"),
+        index.FilterField("id"),
+        # lets search results be ordered and filtered by (term, id) for cursor pagination
+        index.FilterField("term"),
         index.RelatedFields('tags', [
             index.SearchField("name", partial_match=False),
             # Enables filtering of terms by their associated tag IDs in search queries.
@@ -32,5 +40,109 @@ class Term(index.Indexed, DraftStateMixin, RevisionMixin, LockableMixin, Cluster
     def __str__(self):
         return self.term
 
+    def save(self, *args, **kwargs):
+        self.excerpt = get_definition_excerpt(self.definition)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "definition" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "excerpt"}
+        super().save(*args, **kwargs)
+
     class Meta:
         ordering = ["term"]
+
+
+class TagUsage(models.Model):
+    """
+    The number of live terms using each tag, kept up to date by signal handlers so that the tags endpoint doesn't have
+    to count them on every request.
+    """
+    tag = models.OneToOneField(Tag, on_delete=models.CASCADE, primary_key=True, related_name='wagtailterms_usage')
+    name = models.CharField(max_length=100)
+    usage_count = models.PositiveIntegerField()
+
+    class Meta:
+        indexes = [
+            # the order tags are listed in by the tags endpoint, name makes the order stable for keyset pagination
+            models.Index(fields=["-usage_count", "name"], name="wagtailterms_tagusage_order"),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.usage_count})"
+
+    @classmethod
+    def update_for_tags(cls, tag_ids=None):
+        """
+        Recount the live terms using the given tags, or every tag when no tag ids are given.
+        """
+        tagged_terms = WagtailTermTag.objects.filter(content_object__live=True)
+        usages = cls.objects.all()
+        if tag_ids is not None:
+            tag_ids = list(tag_ids)
+            if not tag_ids:
+                return
+            tagged_terms = tagged_terms.filter(tag_id__in=tag_ids)
+            usages = usages.filter(tag_id__in=tag_ids)
+
+        counts = tagged_terms.values("tag_id", "tag__name").annotate(usage_count=models.Count("id"))
+        with transaction.atomic():
+            # the rows of tags still in use are updated in place, so that two saves recounting the same tag at once
+            # don't both insert it
+            usages.exclude(tag_id__in=tagged_terms.values("tag_id")).delete()
+            cls.objects.bulk_create(
+                [
+                    cls(tag_id=count["tag_id"], name=count["tag__name"], usage_count=count["usage_count"])
+                    for count in counts
+                ],
+                update_conflicts=True,
+                # MySQL and MariaDB upsert on any unique key and don't take a list of fields
+                unique_fields=["tag"] if connection.features.supports_update_conflicts_with_target else None,
+                update_fields=["name", "usage_count"],
+            )
+
+
+class TermUsage(models.Model):
+    """
+    A live page or snippet that links a term in its rich text, kept up to date when objects are published so that the
+    places a term is used can be found without reading every rich text field on the site.
+    """
+    term = models.ForeignKey(Term, on_delete=models.CASCADE, related_name='usages')
+    # the base content type of the object, e.g. Page for every page type
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, related_name='+')
+    object_id = models.CharField(max_length=255)
+
+    class Meta:
+        constraints = [
+            # also the index of the objects using a term
+            models.UniqueConstraint(
+                fields=["term", "content_type", "object_id"], name="wagtailterms_termusage_unique"
+            ),
+        ]
+        indexes = [
+            # the terms used by an object, which are replaced when the object is published again
+            models.Index(fields=["content_type", "object_id"], name="wagtailterms_termusage_object"),
+        ]
+
+    def __str__(self):
+        return f"{self.term_id} in {self.content_type_id}:{self.object_id}"
+
+    @classmethod
+    def update_for_object(cls, obj, term_ids):
+        """
+        Set the terms used by an object, only adding and removing the usages that changed.
+        """
+        content_type = get_base_content_type(type(obj))
+        usages = cls.objects.filter(content_type=content_type, object_id=str(obj.pk))
+        # links to deleted terms are left out
+        term_ids = set(Term.objects.filter(pk__in=term_ids).values_list("pk", flat=True)) if term_ids else set()
+        current_ids = set(usages.values_list("term_id", flat=True))
+        with transaction.atomic():
+            if current_ids - term_ids:
+                usages.filter(term_id__in=current_ids - term_ids).delete()
+            cls.objects.bulk_create([
+                cls(term_id=term_id, content_type=content_type, object_id=str(obj.pk))
+                for term_id in term_ids - current_ids
+            ])
+
+    @classmethod
+    def remove_for_object(cls, obj):
+        cls.objects.filter(content_type=get_base_content_type(type(obj)), object_id=str(obj.pk)).delete()
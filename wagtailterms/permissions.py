@@ -1,21 +1,67 @@
 from rest_framework.permissions import BasePermission
 
+from .cache import TAG_GROUPS_VERSION_CACHE_KEY, get_cache, get_version
+from .default_settings import get_setting
+
+
+def get_tag_groups_cache_key(user_id):
+    # the version changes when group membership changes, which leaves every cached check behind
+    return f"wagtailterms:tag-groups:{get_version(TAG_GROUPS_VERSION_CACHE_KEY)}:{user_id}"
+
+
+def in_tag_groups(user):
+    """
+    Return whether the user is in one of the groups in the `tag_groups` setting.
+
+    The answer is kept on the user for the rest of the request and in the cache for `tag_groups_cache_timeout`
+    seconds, so that paging through the tags doesn't check the groups again on every request.
+    """
+    if hasattr(user, "_wagtailterms_in_tag_groups"):
+        return user._wagtailterms_in_tag_groups
+
+    groups = get_setting('tag_groups')
+    key = get_tag_groups_cache_key(user.pk)
+    cached = get_cache().get(key)
+    # the groups are part of the cached value so that changing the setting doesn't use old answers
+    if cached is not None and cached[0] == groups:
+        in_groups = cached[1]
+    else:
+        in_groups = user.groups.filter(name__in=groups).exists()
+        get_cache().set(key, (groups, in_groups), get_setting('tag_groups_cache_timeout'))
+
+    user._wagtailterms_in_tag_groups = in_groups
+    return in_groups
+
+
 class CanAccessTags(BasePermission):
     """
     Custom permission to only allow access to users who are staff,
-    superusers, or in 'Moderators' or 'Editors' groups.
+    superusers, or in one of the groups in the `tag_groups` setting.
     """
     message = "You do not have permission to access this endpoint."
 
     def has_permission(self, request, view):
         user = request.user
-       
 
         if user.is_authenticated and (user.is_staff or user.is_superuser):
             return True
 
-        # Check if user is in 'Moderators' or 'Editors' group
-        if user.is_authenticated and user.groups.filter(name__in=['Moderators', 'Editors']).exists():
+        # Check if user is in one of the tag groups, 'Moderators' or 'Editors' by default
+        if user.is_authenticated and in_tag_groups(user):
             return True
 
         return False
+
+
+class CanViewTermUsage(BasePermission):
+    """
+    Permission to only allow access to users who can access the Wagtail admin, where the pages and snippets listed by
+    the usage endpoint are edited.
+    """
+    message = "You do not have permission to access this endpoint."
+
+    def has_permission(self, request, view):
+        user = request.user
+        return user.is_authenticated and (
+            user.is_staff or user.is_superuser or user.has_perm("wagtailadmin.access_admin")
+        )
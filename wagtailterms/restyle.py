@@ -0,0 +1,122 @@
+import json
+from itertools import islice
+
+from django.db import models, transaction
+from django.db.models.functions import Cast
+from wagtail.fields import StreamField
+from wagtail.models import Revision
+
+from .cache import bump_glossary_version, invalidate_definition
+from .models import Term
+from .utils import get_rich_text_models, rewrite_term_spans
+
+
+def rewrite_value(value):
+    """
+    Return a copy of a stored value with the term spans of every string in it rewritten, looking inside lists, dicts
+    and strings of json such as the StreamField values saved in revisions.
+    """
+    if isinstance(value, str):
+        if "data-term" not in value:
+            return value
+        if value[:1] in ("[", "{"):
+            try:
+                data = json.loads(value)
+            except ValueError:
+                pass
+            else:
+                return json.dumps(rewrite_value(data))
+        return rewrite_term_spans(value)
+    if isinstance(value, list):
+        return [rewrite_value(item) for item in value]
+    if isinstance(value, dict):
+        return {key: rewrite_value(item) for key, item in value.items()}
+    return value
+
+
+def contains_terms(field):
+    # json columns are compared as text, their __contains lookup means json containment
+    return models.Q(**{f"{field}_text__contains": "data-term"})
+
+
+class SpanRewriter:
+    """
+    Rewrite the term spans saved in rich text, StreamField and revision content to match the current `style_mode`,
+    `style` and `class_name` settings, a batch of rows at a time.
+
+    Only rows with `data-term` in them are loaded, and only the rows that change are written back.
+    """
+
+    def __init__(self, batch_size=500, revisions=True, dry_run=False):
+        self.batch_size = batch_size
+        self.revisions = revisions
+        self.dry_run = dry_run
+        # model label -> number of rows changed
+        self.counts = {}
+
+    def rewrite(self):
+        for model, fields in get_rich_text_models():
+            self.rewrite_model(model, fields)
+        if self.revisions:
+            self.rewrite_revisions()
+        return self.counts
+
+    def get_rows(self, model, fields):
+        queryset = model._base_manager.annotate(
+            **{f"{field}_text": Cast(field, models.TextField()) for field in fields}
+        )
+        condition = models.Q()
+        for field in fields:
+            condition |= contains_terms(field)
+        return queryset.filter(condition).order_by("pk")
+
+    def rewrite_model(self, model, fields):
+        rows = self.get_rows(model, fields).values_list("pk", *[f"{field}_text" for field in fields])
+        rows = rows.iterator(chunk_size=self.batch_size)
+        while batch := list(islice(rows, self.batch_size)):
+            changes = []
+            for pk, *values in batch:
+                changed = {}
+                for field, value in zip(fields, values):
+                    if value is None:
+                        continue
+                    if isinstance(model._meta.get_field(field), StreamField):
+                        value = json.loads(value)
+                        new_value = rewrite_value(value)
+                    else:
+                        new_value = rewrite_term_spans(value)
+                    if new_value != value:
+                        changed[field] = new_value
+                if changed:
+                    changes.append((pk, changed))
+            self.save(model, changes)
+
+    def rewrite_revisions(self):
+        rows = Revision.objects.annotate(content_text=Cast("content", models.TextField())).filter(
+            contains_terms("content")
+        ).order_by("pk").values_list("pk", "content")
+        rows = rows.iterator(chunk_size=self.batch_size)
+        while batch := list(islice(rows, self.batch_size)):
+            changes = []
+            for pk, content in batch:
+                new_content = rewrite_value(content)
+                if new_content != content:
+                    changes.append((pk, {"content": new_content}))
+            self.save(Revision, changes)
+
+    def save(self, model, changes):
+        if not changes:
+            return
+        label = model._meta.label
+        self.counts[label] = self.counts.get(label, 0) + len(changes)
+        if self.dry_run:
+            return
+        # StreamField values are written as raw json, which skips converting them to blocks and back
+        with transaction.atomic():
+            for pk, changed in changes:
+                model._base_manager.filter(pk=pk).update(**changed)
+        if model is Term:
+            # updates skip the signals that clear the rendered definitions
+            for pk, changed in changes:
+                invalidate_definition(pk)
+            bump_glossary_version()
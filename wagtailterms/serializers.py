@@ -1,12 +1,23 @@
 from rest_framework import serializers
-from wagtail.templatetags.wagtailcore_tags import richtext
+from .cache import render_definition
 from .models import Term
 from taggit.serializers import (TagListSerializerField,
                               TaggitSerializer)
 from wagtailterms.default_settings import get_setting
+from .timing import get_timer
+from .utils import get_definition_text
+
+# how the definition is returned: rendered html, the precomputed plain text excerpt, the full plain text, or not at all
+DEFINITION_MODES = ["full", "excerpt", "text", "none"]
 
 
 class TermSerializer(TaggitSerializer, serializers.ModelSerializer):
+    """
+    Serializes a term with its rendered definition and tags.
+
+    The `fields` context limits the fields to the given names, and the `definition` context is one of
+    `DEFINITION_MODES`.
+    """
     definition = serializers.SerializerMethodField()
 
     class Meta:
@@ -19,5 +30,18 @@ class TermSerializer(TaggitSerializer, serializers.ModelSerializer):
         if not get_setting('disable_tags'):
             self.fields['tags'] = TagListSerializerField()
 
+        fields = self.context.get("fields")
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        if self.context.get("definition") == "none":
+            self.fields.pop("definition", None)
+
     def get_definition(self, obj):
-        return richtext(obj.definition)
+        mode = self.context.get("definition", "full")
+        if mode == "excerpt":
+            return obj.excerpt
+        if mode == "text":
+            return get_definition_text(obj.definition)
+        with get_timer(self.context.get("request")).phase("definition"):
+            return render_definition(obj)
@@ -0,0 +1,160 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from functools import lru_cache
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from wagtail.models import DraftStateMixin
+from taggit.models import Tag
+from wagtail.signals import published, unpublished
+
+from .autocomplete import update_prefix_index
+from .cache import TAG_GROUPS_VERSION_CACHE_KEY, bump_glossary_version, bump_version, invalidate_definition
+from .default_settings import get_setting
+from .frontend_cache import get_term_pages, purge_pages_from_frontend_cache, purge_term_from_frontend_cache
+from .models import TagUsage, Term, TermUsage, WagtailTermTag
+from .utils import get_object_term_ids, get_rich_text_fields
+
+
+# fields saved by Wagtail without changing the live row of a term, e.g. when a draft revision is saved or the term is
+# locked
+NON_LIVE_FIELDS = {
+    "latest_revision", "has_unpublished_changes", "locked", "locked_by", "locked_at", "go_live_at", "expire_at",
+}
+
+
+def saves_live_term(update_fields):
+    """
+    Return whether a save with the given `update_fields` can change the live content of a term.
+    """
+    return update_fields is None or not set(update_fields) <= NON_LIVE_FIELDS
+
+
+def invalidate_term(sender, instance, update_fields=None, **kwargs):
+    # saving a draft revision or locking the term leaves the live term, and so the glossary, as it was
+    if not saves_live_term(update_fields):
+        return
+    term_id = instance.pk
+
+    # after the commit, otherwise a request in between could read the new version with the old rows and cache them
+    # under the new version
+    def invalidate():
+        invalidate_definition(term_id)
+        bump_glossary_version()
+
+    transaction.on_commit(invalidate)
+
+
+def purge_term(sender, instance, **kwargs):
+    # api responses are only cached by a frontend cache when they are sent with Cache-Control headers
+    if get_setting('cache_control'):
+        # after the commit, otherwise the frontend cache could fetch the old response again and keep it
+        term_id = instance.pk
+        transaction.on_commit(lambda: purge_term_from_frontend_cache(term_id))
+
+
+def invalidate_term_tags(sender, instance, **kwargs):
+    transaction.on_commit(bump_glossary_version)
+
+
+def purge_term_pages(sender, instance, **kwargs):
+    if get_setting('purge_term_pages'):
+        # the pages are found now, the usages of a deleted term are deleted with it before the commit
+        pages = list(get_term_pages(instance.pk))
+        transaction.on_commit(lambda: purge_pages_from_frontend_cache(pages))
+
+
+def update_term_tag_usage(sender, instance, **kwargs):
+    # publishing and unpublishing save the term, so this also recounts the tags when the term goes live or not
+    TagUsage.update_for_tags(
+        WagtailTermTag.objects.filter(content_object_id=instance.pk).values_list("tag_id", flat=True)
+    )
+
+
+def update_tag_usage(sender, instance, **kwargs):
+    TagUsage.update_for_tags([instance.tag_id])
+
+
+def rename_tag_usage(sender, instance, raw=False, **kwargs):
+    # the tags endpoint lists the stored name, and the glossary includes the tag names of each term
+    if not raw and TagUsage.objects.filter(tag_id=instance.pk).exclude(name=instance.name).update(name=instance.name):
+        transaction.on_commit(bump_glossary_version)
+
+
+def update_autocomplete(sender, instance, update_fields=None, **kwargs):
+    # saving a draft revision also saves the term, which doesn't change its live name
+    if not saves_live_term(update_fields):
+        return
+    # once the change is committed, so that the live row read by the index is the new one
+    term_id = instance.pk
+    transaction.on_commit(lambda: update_prefix_index(term_id))
+
+
+@lru_cache(maxsize=None)
+def has_rich_text(model):
+    # the term usage handlers receive the signals of every model
+    return bool(get_rich_text_fields(model))
+
+
+def update_term_usage(sender, instance, **kwargs):
+    if has_rich_text(sender):
+        TermUsage.update_for_object(instance, get_object_term_ids(instance))
+
+
+def update_saved_term_usage(sender, instance, raw=False, **kwargs):
+    # objects without drafts are live as soon as they are saved, the others are indexed when they are published
+    if not raw and not isinstance(instance, DraftStateMixin):
+        update_term_usage(sender, instance)
+
+
+def remove_term_usage(sender, instance, **kwargs):
+    if has_rich_text(sender):
+        TermUsage.remove_for_object(instance)
+
+
+def invalidate_tag_groups(sender, **kwargs):
+    # m2m_changed is sent before and after each change, only the change itself matters
+    if kwargs.get("action", "post_").startswith("post_"):
+        bump_version(TAG_GROUPS_VERSION_CACHE_KEY)
+
+
+def register_signal_handlers():
+    published.connect(invalidate_term, sender=Term)
+    unpublished.connect(invalidate_term, sender=Term)
+    # saving or deleting a term outside of the publishing workflow also changes its definition
+    post_save.connect(invalidate_term, sender=Term)
+    post_delete.connect(invalidate_term, sender=Term)
+
+    published.connect(purge_term, sender=Term)
+    unpublished.connect(purge_term, sender=Term)
+    post_delete.connect(purge_term, sender=Term)
+
+    # pages linking a term include its definition when they use the wagtailterms_payload tag
+    published.connect(purge_term_pages, sender=Term)
+    unpublished.connect(purge_term_pages, sender=Term)
+    # before the usages of the term are deleted with it
+    pre_delete.connect(purge_term_pages, sender=Term)
+
+    post_save.connect(invalidate_term_tags, sender=WagtailTermTag)
+    post_delete.connect(invalidate_term_tags, sender=WagtailTermTag)
+
+    # the tags of a deleted term are deleted one by one first, so they recount themselves
+    post_save.connect(update_term_tag_usage, sender=Term)
+    post_save.connect(update_tag_usage, sender=WagtailTermTag)
+    post_delete.connect(update_tag_usage, sender=WagtailTermTag)
+    post_save.connect(rename_tag_usage, sender=Tag)
+
+    # publishing and unpublishing save the whole term, like creating or changing it through the ORM
+    post_save.connect(update_autocomplete, sender=Term)
+    post_delete.connect(update_autocomplete, sender=Term)
+
+    # adding or removing users from groups, or renaming or deleting groups, changes who can access the tags
+    m2m_changed.connect(invalidate_tag_groups, sender=get_user_model().groups.through)
+    post_save.connect(invalidate_tag_groups, sender=Group)
+    post_delete.connect(invalidate_tag_groups, sender=Group)
+
+    # the usage index follows the live content of pages and snippets of any model
+    published.connect(update_term_usage)
+    unpublished.connect(remove_term_usage)
+    post_save.connect(update_saved_term_usage)
+    post_delete.connect(remove_term_usage)
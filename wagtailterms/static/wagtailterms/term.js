@@ -1,10 +1,95 @@
+// excerpts are plain text, so characters like < must be escaped before they are added to the list
+function escapeHtml(text) {
+    const element = document.createElement('div');
+    element.textContent = text;
+    return element.innerHTML;
+}
+
+// milliseconds to wait after the last keystroke before searching
+const TERM_SEARCH_DELAY = 250;
+
+// a small least recently used cache of responses, kept for a minute so new terms show up when the picker is reopened
+class ResponseCache {
+    constructor(maxSize = 50, maxAge = 60 * 1000) {
+        this.maxSize = maxSize;
+        this.maxAge = maxAge;
+        this.entries = new Map();
+    }
+
+    get(key) {
+        const entry = this.entries.get(key);
+        if (!entry) return undefined;
+        this.entries.delete(key);
+        if (Date.now() - entry.time > this.maxAge) return undefined;
+        // move the entry to the end of the map, which is the most recently used
+        this.entries.set(key, entry);
+        return entry.data;
+    }
+
+    set(key, data) {
+        this.entries.delete(key);
+        this.entries.set(key, {data, time: Date.now()});
+        if (this.entries.size > this.maxSize) {
+            this.entries.delete(this.entries.keys().next().value);
+        }
+    }
+}
+
+// shared by every picker on the page, keyed by the url of the search so it covers the query, tags and page
+const termSearchCache = new ResponseCache();
+
+// Loads the definitions and tags shown in the tooltips of the terms in the editor, which only store the id and name.
+// Terms register their id when they are rendered, and the first time a term is hovered every registered term that
+// isn't loaded yet is fetched with the batch lookup. Shared by every editor on the page.
+class TermLoader {
+    constructor() {
+        // term id -> promise of the term, of null when the term can't be found, or of undefined when loading failed
+        this.terms = new Map();
+        this.pendingIds = new Set();
+    }
+
+    add(id) {
+        if (id && !this.terms.has(id)) {
+            this.pendingIds.add(id);
+        }
+    }
+
+    get(id) {
+        if (!this.terms.has(id)) {
+            this.pendingIds.add(id);
+            this.load();
+        }
+        return this.terms.get(id);
+    }
+
+    load() {
+        const ids = [...this.pendingIds];
+        this.pendingIds.clear();
+        for (let start = 0; start < ids.length; start += WAGTAIL_TERM_BATCH_SIZE) {
+            const chunk = ids.slice(start, start + WAGTAIL_TERM_BATCH_SIZE);
+            const request = fetch(`${WAGTAIL_TERM_PATH}?ids=${chunk.join(',')}`)
+                .then(response => response.ok ? response.json() : [])
+                .then(terms => new Map(terms.map(term => [term.id, term])));
+            for (const id of chunk) {
+                this.terms.set(id, request.then(terms => terms.get(id) || null, () => {
+                    // let a failed request be retried the next time the term is hovered
+                    this.terms.delete(id);
+                    return undefined;
+                }));
+            }
+        }
+    }
+}
+
+const termLoader = new TermLoader();
+
 // Not a real React component – just creates the entities as soon as it is rendered.
 class TermSource extends window.React.Component {
     state = {
         terms: [],
         selectedTags: new Set(),
         isModalVisible: false,
-        tagPage: 1,
+        tagCursor: null,
         isLoadingTags: false,
         hasMoreTags: true,
         currentPage: 1,
@@ -141,6 +226,10 @@ class TermSource extends window.React.Component {
             return;
         }
 
+        this.insertTerm(term);
+    }
+
+    insertTerm = (term) => {
         const {editorState, entityType, onComplete} = this.props;
         const content = editorState.getCurrentContent();
         const selection = editorState.getSelection();
@@ -155,7 +244,8 @@ class TermSource extends window.React.Component {
         const contentWithEntity = content.createEntity(
             entityType.type,
             'MUTABLE',
-            {text: current_selected_text, term: term, id: term.id, tags: term.tags},
+            // the definition and tags are loaded when the term is hovered, so they aren't saved in the contentstate
+            {term: {id: term.id, term: term.term}},
         );
 
         // add text in position of the old text. If no text was selected put the text of the term.
@@ -211,12 +301,13 @@ class TermSource extends window.React.Component {
         `).join('');
     }
 
-    searchTags = (page = 1, append = false) => {
-        if (this.state.isLoadingTags || (!this.state.hasMoreTags && page > 1)) return;
+    // cursor is the `next` value of the previous page of tags, or null for the first page
+    searchTags = (cursor = null, append = false) => {
+        if (this.state.isLoadingTags || (!this.state.hasMoreTags && cursor)) return;
 
         this.setState({ isLoadingTags: true });
         
-        fetch(`${WAGTAIL_TERM_PATH}tags/?page=${page}`)
+        fetch(`${WAGTAIL_TERM_PATH}tags/${cursor ? `?cursor=${encodeURIComponent(cursor)}` : ''}`)
             .then(response => response.json())
             .then(data => {
                 const tagListDiv = document.getElementById("tag-list");
@@ -240,7 +331,7 @@ class TermSource extends window.React.Component {
                 // We don't need to add click event listeners here anymore since we're using onclick in the HTML
 
                 this.setState({ 
-                    tagPage: page,
+                    tagCursor: data.next || null,
                     isLoadingTags: false,
                     hasMoreTags: hasMore
                 });
@@ -253,15 +344,16 @@ class TermSource extends window.React.Component {
 
     handleTagScroll = (e) => {
         const element = e.target;
-        if (element.scrollHeight - element.scrollTop <= element.clientHeight + 100) {
-            this.searchTags(this.state.tagPage + 1, true);
+        if (element.scrollHeight - element.scrollTop <= element.clientHeight + 100 && this.state.tagCursor) {
+            this.searchTags(this.state.tagCursor, true);
         }
     }
 
     buildTermsUrl = (page, searchQuery) => {
-        let url = `${WAGTAIL_TERM_PATH}?page=${page}`;
+        // only the plain text start of each definition is shown in the list
+        let url = `${WAGTAIL_TERM_PATH}?page=${page}&definition=excerpt`;
         if (searchQuery) {
-            url += `&q=${searchQuery}`;
+            url += `&q=${encodeURIComponent(searchQuery)}`;
         }
         if (!WAGTAIL_TERM_DISABLE_TAGS && this.state.selectedTags.size > 0) {
             const tags = Array.from(this.state.selectedTags);
@@ -281,11 +373,7 @@ class TermSource extends window.React.Component {
                 <div style="font-weight: 500;">${item.term}</div>
             </td>
             <td style="padding: 8px; border-bottom: 1px solid var(--w-color-border-field); color: var(--w-color-text-context);">
-                ${item.definition ? 
-                    (item.definition.length > 150 ? 
-                        item.definition.substring(0, 150) + '...' : 
-                        item.definition) : 
-                    ''}
+                ${item.definition ? escapeHtml(item.definition) : ''}
             </td>
             ${!WAGTAIL_TERM_DISABLE_TAGS ? `
             <td style="padding: 8px; border-bottom: 1px solid var(--w-color-border-field);">
@@ -380,44 +468,72 @@ class TermSource extends window.React.Component {
     }
 
     getSearchTerms = (page = 1, append = false) => {
-        // Don't fetch if we're already loading
-        if (this.state.isLoadingTerms) return;
+        // the latest search always wins, a request still running for an earlier one is cancelled
+        if (this.searchController) {
+            this.searchController.abort();
+            this.searchController = null;
+        }
 
         const searchBox = document.getElementById("term-selector-popup-search-box");
+        const url = this.buildTermsUrl(page, searchBox.value);
+        const showTerms = (data) => {
+            // Update page state before updating the list
+            this.setState({ currentPage: page }, () => {
+                this.updateTermsList(data, append);
+            });
+        };
+
+        const cached = termSearchCache.get(url);
+        if (cached) {
+            showTerms(cached);
+            return;
+        }
+
+        const controller = new AbortController();
+        this.searchController = controller;
         this.setState({ isLoadingTerms: true });
-        
-        fetch(this.buildTermsUrl(page, searchBox.value))
+
+        fetch(url, { signal: controller.signal })
             .then(response => response.json())
             .then(data => {
-                // Update page state before updating the list
-                this.setState({ currentPage: page }, () => {
-                    this.updateTermsList(data, append);
-                });
+                termSearchCache.set(url, data);
+                if (this.searchController === controller) {
+                    this.searchController = null;
+                }
+                showTerms(data);
             })
-            .catch(this.handleSearchError);
+            .catch(error => {
+                if (error.name !== 'AbortError') {
+                    this.handleSearchError(error);
+                }
+            });
     }
 
     handlePageChange = (page) => {
-        if (page < 1 || this.state.isLoadingTerms) {
+        if (page < 1) {
             return;
         }
         this.getSearchTerms(page, false);
     }
 
     handleSearchInput = () => {
-        // Reset pagination when search input changes
-        this.setState({
-            currentPage: 1,
-            terms: [],
-            hasMoreTerms: true
-        }, () => {
-            this.getSearchTerms(1, false);
-        });
+        // wait for the user to stop typing before searching
+        clearTimeout(this.searchTimeout);
+        this.searchTimeout = setTimeout(() => {
+            // Reset pagination when search input changes
+            this.setState({
+                currentPage: 1,
+                terms: [],
+                hasMoreTerms: true
+            }, () => {
+                this.getSearchTerms(1, false);
+            });
+        }, TERM_SEARCH_DELAY);
     }
 
     loadInitialTags = () => {
-        this.setState({ tagPage: 1, hasMoreTags: true }, () => {
-            this.searchTags(1, false);
+        this.setState({ tagCursor: null, hasMoreTags: true }, () => {
+            this.searchTags(null, false);
         });
     }
 
@@ -462,7 +578,8 @@ class TermSource extends window.React.Component {
             const current_selected_text = content.getBlockForKey(anchorKey).getText().slice(start, end);
 
             searchBox.value = current_selected_text;
-            searchBox.onkeyup = this.handleSearchInput;
+            // input events only fire when the text changes, not for arrow keys and other keys that don't edit it
+            searchBox.oninput = this.handleSearchInput;
         }
 
         if (!WAGTAIL_TERM_DISABLE_TAGS) {
@@ -493,6 +610,10 @@ class TermSource extends window.React.Component {
 
     componentWillUnmount() {
         // Clean up modal and event listeners when component unmounts
+        clearTimeout(this.searchTimeout);
+        if (this.searchController) {
+            this.searchController.abort();
+        }
         const modal = document.getElementById('term-selector-modal');
         if (!WAGTAIL_TERM_DISABLE_TAGS) {
             const tagListDiv = document.getElementById("tag-list");
@@ -524,21 +645,55 @@ class Term extends window.React.Component{
             randomString:(Math.random() + 1).toString(36).substring(7),
             term:data.term
         }
+        this.tooltip = null;
+        this.loading = null;
+        termLoader.add(data.term.id);
     }
 
-    componentDidMount(){
-        tippy(document.getElementById(`term_${this.state.term.id}_${this.state.randomString}`),
-        {
-            content: `<h4 style="color: white">${this.state.term.term}</h4>
-                 ${this.state.term.tags && this.state.term.tags.length > 0 ? 
-                   `<p><small>Tags: ${this.state.term.tags.join(', ')}</small></p>` : ''}
-                 <p>${this.state.term.definition}</p>`,
-            allowHTML: true,
-            interactive: true,
-            appendTo: () => document.body, theme: 'light-border'
+    // the tooltip is only created when the term is first hovered, so long pages don't create one for every term
+    showTooltip = (event) => {
+        const {term} = this.state;
+        const title = `<h4 style="color: white">${escapeHtml(term.term)}</h4>`;
+        if (!this.tooltip) {
+            this.tooltip = tippy(event.currentTarget, {
+                content: title + (term.id ? '<p>Loading…</p>' : '<p><i>This term might be deleted</i></p>'),
+                allowHTML: true,
+                interactive: true,
+                appendTo: () => document.body, theme: 'light-border'
+            });
+            this.tooltip.show();
+        }
+        if (!term.id || this.loading) return;
+
+        // older revisions saved the whole term in the contentstate
+        this.loading = term.definition !== undefined ? Promise.resolve(term) : termLoader.get(term.id);
+        this.loading.then(data => {
+            if (!this.tooltip) return;
+            if (data === undefined) {
+                this.tooltip.setContent(title + "<p style='color: red'>Could not load the definition</p>");
+                // try again on the next hover
+                this.loading = null;
+            } else if (data === null) {
+                // only staff users are given terms that aren't live
+                this.tooltip.setContent(title + '<p><i>This term might be deleted or unpublished</i></p>');
+            } else {
+                this.tooltip.setContent(
+                    `${title}
+                     ${data.tags && data.tags.length > 0 ?
+                       `<p><small>Tags: ${data.tags.map(escapeHtml).join(', ')}</small></p>` : ''}
+                     <p>${data.definition}</p>`
+                );
+            }
         });
     }
 
+    componentWillUnmount() {
+        if (this.tooltip) {
+            this.tooltip.destroy();
+            this.tooltip = null;
+        }
+    }
+
     render(){
         // this is the jsx equivalent. jsx is not available since this is using the build system of wagtail which only gives access to React.
         // cannot use the build system of the rest of the project since it doesn't load at
@@ -572,6 +727,7 @@ class Term extends window.React.Component{
             id: `term_${this.state.term.id}_${this.state.randomString}`,
             // WAGTAIL_TERM_STYLE is injected in wagtail_hooks file. This is the style set for the term as a string.
             style:convertToCamel(WAGTAIL_TERM_STYLE),
+            onMouseEnter: this.showTooltip,
             children: this.props.children
     })
     }
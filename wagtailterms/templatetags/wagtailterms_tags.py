@@ -0,0 +1,95 @@
+from django import template
+from django.urls import reverse
+from django.utils.html import conditional_escape, format_html, json_script
+from django.utils.safestring import mark_safe
+
+from wagtailterms.autolink import autolink_html
+from wagtailterms.cache import get_glossary_version
+from wagtailterms.default_settings import get_setting
+from wagtailterms.models import Term
+from wagtailterms.serializers import TermSerializer
+from wagtailterms.utils import get_value_term_ids
+from wagtailterms.views import TermViewSet
+
+register = template.Library()
+
+PAYLOAD_ELEMENT_ID = "wagtailterms-payload"
+
+
+@register.simple_tag
+def wagtailterms_payload(*values):
+    """
+    Render every term used in the given rich text values as a json script block so that the tooltips can be shown
+    without calling the terms api.
+
+    Usage: {% wagtailterms_payload page.body %}
+    """
+    term_ids = set()
+    for value in values:
+        term_ids.update(get_value_term_ids(value))
+
+    payload = {}
+    if term_ids:
+        terms = Term.objects.filter(live=True, id__in=term_ids)
+        if not get_setting('disable_tags'):
+            terms = terms.prefetch_related("tags")
+        payload = {term["id"]: term for term in TermSerializer(terms, many=True).data}
+
+    return json_script(payload, PAYLOAD_ELEMENT_ID)
+
+
+@register.inclusion_tag("wagtailterms/wagtailterms.html", takes_context=True)
+def wagtailterms_tooltips(context, *values):
+    """
+    Render the tooltip scripts, unless none of the given rich text or html values have any terms. The scripts are
+    served from the static files, so they get hashed names with a manifest static files storage.
+
+    Usage: {% wagtailterms_tooltips page.body %}
+    """
+    has_terms = not values or any(get_value_term_ids(value) for value in values if value)
+    return {"request": context.get("request"), "wagtailterms_skip": not has_terms}
+
+
+@register.simple_tag
+def wagtailterms_glossary_version():
+    """
+    Return the version of the glossary, which changes whenever a term or tag changes. The tooltips use it to tell
+    whether the terms they stored in the browser are still up to date.
+
+    Usage: {% wagtailterms_glossary_version %}
+    """
+    return str(get_glossary_version())
+
+
+@register.simple_tag
+def wagtailterms_batch_size():
+    """
+    Return the most terms the terms api returns for one batch lookup with the `ids` query parameter.
+
+    Usage: {% wagtailterms_batch_size %}
+    """
+    return TermViewSet.max_batch_size
+
+
+@register.filter
+def autolink_terms(value, mode="first"):
+    """
+    Link the live terms found in rendered html to their definitions. Only the first occurrence of each term is
+    linked unless "all" is given.
+
+    Usage: {{ page.body|richtext|autolink_terms }} or {{ page.body|richtext|autolink_terms:"all" }}
+    """
+    return mark_safe(autolink_html(str(conditional_escape(value)), first_only=mode != "all"))
+
+
+@register.simple_tag
+def wagtailterms_stylesheet():
+    """
+    Render a link to the stylesheet of the term spans when they are saved with a class instead of an inline style,
+    and nothing otherwise.
+
+    Usage: {% wagtailterms_stylesheet %}
+    """
+    if get_setting('style_mode') != 'class':
+        return ""
+    return format_html('<link rel="stylesheet" href="{}">', reverse("wagtailterms:terms-stylesheet"))
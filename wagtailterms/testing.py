@@ -1,3 +1,5 @@
+from wagtail.contrib.frontend_cache.backends import BaseBackend
+
 # Test settings to ensure consistent search behavior
 test_settings = {
     'WAGTAILSEARCH_BACKENDS': {
@@ -5,5 +7,20 @@ test_settings = {
             'BACKEND': 'wagtail.search.backends.database',
             'AUTO_UPDATE': True,
         },
-    }
+    },
+    # the templates load static files, which the example's manifest storage only finds after collectstatic
+    'STORAGES': {
+        'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    },
 }
+
+
+class RecordingFrontendCacheBackend(BaseBackend):
+    """
+    A frontend cache backend for tests that records the purged urls instead of sending them anywhere.
+    """
+    purged_urls = []
+
+    def purge(self, url):
+        self.purged_urls.append(url)
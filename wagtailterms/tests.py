@@ -78,6 +78,58 @@ class TestTermEntity(APITestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(len(response.data['results']), 3)
 
+    def test_batch_lookup(self):
+        """Test that many terms can be fetched at once with the ids parameter"""
+        response = self.client.get(
+                f"{reverse('wagtailterms:terms-list')}?ids={self.term1.id},{self.term3.id},{self.term4.id}"
+        )
+        self.assertEqual(response.status_code, 200)
+        # batch lookups are not paginated and non live terms are hidden from non staff
+        self.assertEqual({term["id"] for term in response.data}, {self.term1.id, self.term3.id})
+
+        # repeated parameters work the same as a comma separated list
+        response = self.client.get(
+                f"{reverse('wagtailterms:terms-list')}?ids={self.term1.id}&ids={self.term2.id}&ids={self.term1.id}"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({term["id"] for term in response.data}, {self.term1.id, self.term2.id})
+
+        # the whole batch is loaded with a constant number of queries
+        with self.assertNumQueries(2):
+            self.client.get(f"{reverse('wagtailterms:terms-list')}?ids={self.term1.id},{self.term2.id}")
+
+    def test_batch_lookup_limit(self):
+        """Test that a batch lookup can not request more than the maximum batch size"""
+        ids = ",".join(str(i) for i in range(1, 102))
+        response = self.client.get(f"{reverse('wagtailterms:terms-list')}?ids={ids}")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("ids", response.data)
+
+    def test_payload_template_tag(self):
+        """Test that the payload template tag renders every term used in the content"""
+        import json
+        from django.template import Context, Template
+
+        content = (
+            f'<p><span data-term="{self.term1.id}">one</span> <span data-term="{self.term1.id}">again</span> '
+            f'<span data-term="{self.term4.id}">not live</span> <span data-term=\'{self.term3.id}\'>three</span></p>'
+        )
+        template = Template("{% load wagtailterms_tags %}{% wagtailterms_payload content %}")
+        with self.assertNumQueries(2):
+            rendered = template.render(Context({"content": content}))
+
+        self.assertIn('<script id="wagtailterms-payload" type="application/json">', rendered)
+        payload = json.loads(rendered.split(">", 1)[1].rsplit("</script>", 1)[0])
+        # only live terms are included in the payload
+        self.assertEqual(set(payload), {str(self.term1.id), str(self.term3.id)})
+        self.assertEqual(payload[str(self.term1.id)]["term"], "Test Term")
+        self.assertEqual(payload[str(self.term1.id)]["definition"], "Definition with special keyword xuqwn")
+
+        # content without terms does not query the database
+        with self.assertNumQueries(0):
+            rendered = template.render(Context({"content": "<p>No terms here</p>"}))
+        self.assertIn(">{}</script>", rendered)
+
     def test_admin_can_view(self):
         self.client.login(username="admin", password="pass")
         response = self.client.get(reverse("wagtailterms:terms-list"))
@@ -294,6 +346,207 @@ class TestTermEntity(APITestCase):
         self.assertTrue(len(terms) > 0, "Should get some results")
         self.assertIn("Test Term", terms)  # Should definitely include term with both tags
 
+    def test_tag_mode(self):
+        """Test filtering terms that have all or any of the tags"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.term1.tags.add("tag1", "tag2")
+            self.term1.save()
+            self.term2.tags.add("tag1")
+            self.term2.save()
+            self.term3.tags.add("tag2", "tag3")
+            self.term3.save()
+
+        url = reverse("wagtailterms:terms-list")
+        response = self.client.get(f"{url}?tags=tag1&tags=tag2")
+        self.assertEqual([term["term"] for term in response.data["results"]], ["Test Term"])
+        response = self.client.get(f"{url}?tags=tag1&tags=tag2&tag_mode=all")
+        self.assertEqual([term["term"] for term in response.data["results"]], ["Test Term"])
+        response = self.client.get(f"{url}?tags=tag1&tags=tag2&tag_mode=any")
+        self.assertEqual(
+            [term["term"] for term in response.data["results"]], ["Special Term", "Test Term", "Test Term 2"]
+        )
+
+        # tag filters can be combined with a search
+        response = self.client.get(f"{url}?tags=tag2&tag_mode=any&q=Special")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Special Term", [term["term"] for term in response.data["results"]])
+        self.assertNotIn("Test Term 2", [term["term"] for term in response.data["results"]])
+
+    def test_tag_filter_query_does_not_grow_with_tags(self):
+        """Test that filtering by more tags doesn't add a join per tag"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.term1.tags.add(*[f"tag{i}" for i in range(5)])
+            self.term1.save()
+
+        joins = []
+        for tag_count in [1, 5]:
+            tags = "&".join(f"tags=tag{i}" for i in range(tag_count))
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(f"{reverse('wagtailterms:terms-list')}?{tags}")
+            self.assertEqual([term["term"] for term in response.data["results"]], ["Test Term"])
+            term_query = next(query["sql"] for query in queries if 'FROM "wagtailterms_term"' in query["sql"])
+            joins.append(term_query.count("JOIN"))
+        self.assertEqual(joins[0], joins[1])
+
+    def test_prefix_index(self):
+        """Test looking up terms by the start of their name or of any word in it"""
+        from .autocomplete import PrefixIndex
+
+        index = PrefixIndex([(1, "Test Term"), (2, "Special Term"), (3, "Testing"), (4, "Other")])
+        self.assertEqual(index.search("test"), [(1, "Test Term"), (3, "Testing")])
+        # terms whose name starts with the prefix come before terms with a later word starting with it
+        self.assertEqual(index.search("TE"), [(1, "Test Term"), (3, "Testing"), (2, "Special Term")])
+        self.assertEqual(index.search("te", limit=2), [(1, "Test Term"), (3, "Testing")])
+        self.assertEqual(index.search("special t"), [(2, "Special Term")])
+        self.assertEqual(index.search("xyz"), [])
+        self.assertEqual(index.search(""), [])
+
+        index.add(4, "Tea")
+        index.remove(1)
+        self.assertEqual(index.search("te"), [(4, "Tea"), (3, "Testing"), (2, "Special Term")])
+        self.assertEqual(index.search("other"), [])
+
+    def test_autocomplete(self):
+        """Test the autocomplete endpoint"""
+        from .cache import TERM_NAMES_VERSION_CACHE_KEY, bump_version
+
+        # changes rolled back by earlier tests aren't seen by the index so start from a fresh one
+        bump_version(TERM_NAMES_VERSION_CACHE_KEY)
+        url = reverse("wagtailterms:terms-autocomplete")
+        response = self.client.get(f"{url}?q=spec")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["results"], [{"id": self.term3.id, "term": "Special Term"}])
+
+        # only live terms are suggested
+        response = self.client.get(f"{url}?q=test term")
+        self.assertEqual(
+            [result["term"] for result in response.data["results"]], ["Test Term", "Test Term 2"]
+        )
+
+        # the index follows changes to terms
+        with self.captureOnCommitCallbacks(execute=True):
+            self.term4.save_revision().publish()
+            self.term2.unpublish()
+        response = self.client.get(f"{url}?q=test term")
+        self.assertEqual(
+            [result["term"] for result in response.data["results"]], ["Test Term", "Test Term 4"]
+        )
+
+        # queries that don't match the start of a term use the search backend
+        response = self.client.get(f"{url}?q=xuqwn")
+        self.assertEqual(
+            {result["term"] for result in response.data["results"]}, {"Test Term", "Test Term 4"}
+        )
+
+    def test_autocomplete_ignores_drafts(self):
+        """Test that saving a draft doesn't change the live name of a term in the autocomplete index"""
+        from .cache import TERM_NAMES_VERSION_CACHE_KEY, bump_version
+
+        bump_version(TERM_NAMES_VERSION_CACHE_KEY)
+        url = reverse("wagtailterms:terms-autocomplete")
+        self.assertEqual(self.client.get(f"{url}?q=spec").data["results"], [{"id": self.term3.id, "term": "Special Term"}])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.term3.term = "Zeta"
+            self.term3.save_revision()
+        self.assertEqual(self.client.get(f"{url}?q=spec").data["results"], [{"id": self.term3.id, "term": "Special Term"}])
+        self.assertEqual(self.client.get(f"{url}?q=zeta").data["results"], [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.term3.save_revision().publish()
+        self.assertEqual(self.client.get(f"{url}?q=zeta").data["results"], [{"id": self.term3.id, "term": "Zeta"}])
+        self.assertEqual(self.client.get(f"{url}?q=spec").data["results"], [])
+
+    def test_autocomplete_follows_orm_changes(self):
+        """Test that terms created or renamed through the ORM are found by the autocomplete endpoint"""
+        from .cache import TERM_NAMES_VERSION_CACHE_KEY, bump_version
+
+        bump_version(TERM_NAMES_VERSION_CACHE_KEY)
+        url = reverse("wagtailterms:terms-autocomplete")
+        self.assertEqual(self.client.get(f"{url}?q=al").data["results"], [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            alpha = Term.objects.create(term="Alpha", definition="<p>First</p>", live=True)
+        self.assertEqual(self.client.get(f"{url}?q=al").data["results"], [{"id": alpha.id, "term": "Alpha"}])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            alpha.term = "Beta"
+            alpha.save()
+        self.assertEqual(self.client.get(f"{url}?q=al").data["results"], [])
+        self.assertEqual(self.client.get(f"{url}?q=bet").data["results"], [{"id": alpha.id, "term": "Beta"}])
+
+    def test_autocomplete_index_is_rebuilt_after_changes_in_other_processes(self):
+        """Test that the prefix index is rebuilt when its version is out of date"""
+        from .autocomplete import get_prefix_index
+        from .cache import TERM_NAMES_VERSION_CACHE_KEY, bump_version
+
+        index = get_prefix_index()
+        with self.assertNumQueries(0):
+            self.assertIs(get_prefix_index(), index)
+
+        # a change to the terms in another process
+        Term.objects.filter(id=self.term1.id).update(term="Renamed")
+        bump_version(TERM_NAMES_VERSION_CACHE_KEY)
+        self.assertEqual(get_prefix_index().search("renamed"), [(self.term1.id, "Renamed")])
+
+    def test_term_matcher(self):
+        """Test finding term names in text as whole words"""
+        from .autolink import TermMatcher
+
+        matcher = TermMatcher([(1, "term"), (2, "special term"), (3, "cat"), (4, "he"), (5, "she")])
+        text = "A Special Term, a term and terms. Scatter cat! She"
+        self.assertEqual(
+            [(text[start:end], term_id) for start, end, term_id in matcher.find(text)],
+            [("Special Term", 2), ("term", 1), ("cat", 3), ("She", 5)],
+        )
+
+    def test_autolink_terms_filter(self):
+        """Test that the autolink filter wraps terms found in html with term spans"""
+        from django.template import Context, Template
+        from django.utils.safestring import mark_safe
+        from .cache import TERM_NAMES_VERSION_CACHE_KEY, bump_version
+
+        bump_version(TERM_NAMES_VERSION_CACHE_KEY)
+        html = mark_safe(
+            '<p>The special term and the Test Term &amp; test term 2.</p>'
+            '<p>Test Term again, <a href="/">test term 2 in a link</a> '
+            f'<span data-term="{self.term3.id}">Special Term</span> <b>Test Term 4</b></p>'
+        )
+        template = Template("{% load wagtailterms_tags %}{{ html|autolink_terms }}")
+        rendered = template.render(Context({"html": html}))
+
+        style = 'style="text-decoration-line: underline; text-decoration-color: green;text-decoration-thickness: 3px;color:green;"'
+        self.assertEqual(rendered, (
+            # special term is already linked further on, and non live terms aren't linked
+            f'<p>The special term and the <span {style} data-term="{self.term1.id}">Test Term</span> &amp; '
+            f'<span {style} data-term="{self.term2.id}">test term 2</span>.</p>'
+            '<p>Test Term again, <a href="/">test term 2 in a link</a> '
+            f'<span data-term="{self.term3.id}">Special Term</span> <b>Test Term 4</b></p>'
+        ))
+
+        # link every occurrence
+        template = Template('{% load wagtailterms_tags %}{{ html|autolink_terms:"all" }}')
+        rendered = template.render(Context({"html": html}))
+        # non live terms aren't linked, but the live term at the start of one is
+        self.assertEqual(rendered.count(f'data-term="{self.term1.id}"'), 3)
+        self.assertEqual(rendered.count(f'data-term="{self.term3.id}"'), 2)
+
+    def test_autolink_follows_orm_changes(self):
+        """Test that terms created through the ORM are linked by the autolink filter"""
+        from django.template import Context, Template
+        from .cache import TERM_NAMES_VERSION_CACHE_KEY, bump_version
+
+        bump_version(TERM_NAMES_VERSION_CACHE_KEY)
+        template = Template("{% load wagtailterms_tags %}{{ html|autolink_terms }}")
+        self.assertNotIn("data-term", template.render(Context({"html": "<p>Alpha</p>"})))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            alpha = Term.objects.create(term="Alpha", definition="<p>First</p>", live=True)
+        self.assertIn(f'data-term="{alpha.id}">Alpha</span>', template.render(Context({"html": "<p>Alpha</p>"})))
+
     def test_tags_endpoint(self):
         """Test the tags endpoint"""
         # Login as editor user to access the endpoint
@@ -336,6 +589,695 @@ class TestTermEntity(APITestCase):
         self.assertIn('hasMore', response.data)  # Ensure 'hasMore' is present
         self.assertFalse(response.data['hasMore'])
 
+    def test_tag_usage_is_kept_up_to_date(self):
+        """Test that the stored tag counts follow changes to terms and their tags"""
+        from .models import TagUsage
+
+        def counts():
+            return dict(TagUsage.objects.values_list("name", "usage_count"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.term1.tags.add("tag1", "tag2")
+            self.term1.save()
+            self.term2.tags.add("tag1")
+            self.term2.save()
+            # terms that aren't live aren't counted
+            self.term4.tags.add("tag1")
+            self.term4.save()
+        self.assertEqual(counts(), {"tag1": 2, "tag2": 1})
+
+        # removing a tag
+        with self.captureOnCommitCallbacks(execute=True):
+            self.term1.tags.remove("tag2")
+            self.term1.save()
+        self.assertEqual(counts(), {"tag1": 2})
+
+        # unpublishing and publishing
+        with self.captureOnCommitCallbacks(execute=True):
+            self.term2.unpublish()
+        self.assertEqual(counts(), {"tag1": 1})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.term4.save_revision().publish()
+        self.assertEqual(counts(), {"tag1": 2})
+
+        # renaming the tag
+        from taggit.models import Tag
+        tag = Tag.objects.get(name="tag1")
+        tag.name = "renamed"
+        tag.save()
+        self.assertEqual(counts(), {"renamed": 2})
+
+        # recounting a tag that is already counted updates its row
+        TagUsage.update_for_tags([tag.pk])
+        self.assertEqual(counts(), {"renamed": 2})
+
+        # deleting
+        with self.captureOnCommitCallbacks(execute=True):
+            self.term1.delete()
+        self.assertEqual(counts(), {"renamed": 1})
+
+    def test_rebuild_tag_usage_command(self):
+        """Test that the tag counts can be rebuilt from scratch"""
+        from .models import TagUsage
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.term1.tags.add("tag1", "tag2")
+            self.term1.save()
+            self.term2.tags.add("tag1")
+            self.term2.save()
+
+        TagUsage.objects.all().delete()
+        call_command("wagtailterms_rebuild_tag_usage", verbosity=0)
+        self.assertEqual(dict(TagUsage.objects.values_list("name", "usage_count")), {"tag1": 2, "tag2": 1})
+
+    def test_import_terms(self):
+        """Test importing terms with tags and revisions from csv and jsonl files"""
+        import os
+        import tempfile
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from .models import TagUsage
+
+        self.term1.tags.add("existing")
+        self.term1.save()
+        with tempfile.TemporaryDirectory() as directory:
+            csv_path = os.path.join(directory, "terms.csv")
+            with open(csv_path, "w", newline="", encoding="utf-8") as file:
+                file.write("term,definition,tags,live\n")
+                for i in range(25):
+                    file.write(f'Imported {i},<p>Definition {i}</p>,"existing, new tag",true\n')
+                file.write("Draft,<p>Not live</p>,,false\n")
+
+            # the number of queries depends on the number of batches, not the number of terms
+            with CaptureQueriesContext(connection) as queries:
+                call_command("wagtailterms_import", csv_path, batch_size=10, revisions=True, verbosity=0)
+            self.assertLess(len(queries), 100)
+
+            jsonl_path = os.path.join(directory, "terms.jsonl")
+            with open(jsonl_path, "w", encoding="utf-8") as file:
+                file.write('{"term": "From jsonl", "definition": "<p>json</p>", "tags": ["jsonl"]}\n')
+            call_command("wagtailterms_import", jsonl_path, verbosity=0)
+
+        imported = Term.objects.get(term="Imported 3")
+        self.assertTrue(imported.live)
+        self.assertEqual(sorted(imported.tags.names()), ["existing", "new tag"])
+        self.assertEqual(imported.latest_revision.as_object().definition, "<p>Definition 3</p>")
+        self.assertEqual(imported.live_revision, imported.latest_revision)
+        self.assertFalse(Term.objects.get(term="Draft").live)
+        self.assertEqual(Term.objects.get(term="From jsonl").latest_revision, None)
+        self.assertEqual(
+            dict(TagUsage.objects.values_list("name", "usage_count")), {"existing": 26, "new tag": 25, "jsonl": 1}
+        )
+
+        # imported terms are in the search index
+        response = self.client.get(reverse("wagtailterms:terms-list"), {"q": "jsonl"})
+        self.assertEqual([term["term"] for term in response.data["results"]], ["From jsonl"])
+
+    def test_import_invalid_terms(self):
+        """Test that importing a file with a missing term fails with the line number"""
+        import os
+        import tempfile
+        from django.core.management.base import CommandError
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "terms.csv")
+            with open(path, "w", newline="", encoding="utf-8") as file:
+                file.write("term,definition\nFine,<p>ok</p>\n,<p>no term</p>\n")
+            with self.assertRaisesMessage(CommandError, "Line 3 has no term"):
+                call_command("wagtailterms_import", path, verbosity=0)
+
+            with self.assertRaisesMessage(CommandError, "Could not open"):
+                call_command("wagtailterms_import", os.path.join(directory, "missing.csv"), verbosity=0)
+
+    def test_import_terms_without_bulk_insert_ids(self):
+        """Test importing terms on databases where bulk_create doesn't set the ids of the new rows"""
+        import os
+        import tempfile
+        from unittest import mock
+        from django.db import connection
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "terms.jsonl")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write('{"term": "Same", "definition": "<p>one</p>", "tags": ["first"]}\n')
+                file.write('{"term": "Same", "definition": "<p>two</p>", "tags": ["second"]}\n')
+            with mock.patch.object(
+                type(connection.features), "can_return_rows_from_bulk_insert", new_callable=mock.PropertyMock,
+                return_value=False,
+            ):
+                call_command("wagtailterms_import", path, verbosity=0)
+
+        terms = Term.objects.filter(term="Same").order_by("pk")
+        self.assertEqual([list(term.tags.names()) for term in terms], [["first"], ["second"]])
+
+    def test_export_terms(self):
+        """Test that exported terms can be imported again"""
+        import io
+        from .importexport import read_terms
+
+        self.term1.tags.add("tag one", "tag2")
+        self.term1.save()
+        for format in ["csv", "jsonl"]:
+            output = io.StringIO()
+            call_command("wagtailterms_export", format=format, live=True, chunk_size=2, stdout=output)
+            output.seek(0)
+            rows = list(read_terms(output, format))
+            self.assertEqual([row["term"] for row in rows], ["Test Term", "Test Term 2", "Special Term"])
+            self.assertEqual(sorted(rows[0]["tags"]), ["tag one", "tag2"])
+            self.assertEqual(rows[0]["definition"], self.term1.definition)
+            self.assertTrue(rows[0]["live"])
+
+    def test_terms_cursor_pagination(self):
+        """Test that the terms list can be paged through with a cursor, with search and tags, without counting"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        for i in range(30):
+            term = Term.objects.create(term="Paged" if i % 2 else f"Paged {i:02}", definition="<p>paged</p>", live=True)
+            if i % 3 == 0:
+                term.tags.add("third")
+                term.save()
+        expected = list(Term.objects.filter(live=True).order_by("term", "id").values_list("id", flat=True))
+
+        def page_through(params):
+            ids = []
+            url = reverse("wagtailterms:terms-list")
+            while url:
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(url, params)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotIn("count", response.data)
+                self.assertFalse(any("__count" in query["sql"] for query in queries))
+                ids.extend(term["id"] for term in response.data["results"])
+                url, params = response.data["next"], None
+            return ids
+
+        self.assertEqual(page_through({"pagination": "cursor", "page_size": 7}), expected)
+
+        # terms with the same name are ordered by id so they aren't repeated or skipped between pages
+        paged = list(Term.objects.filter(term__startswith="Paged").order_by("term", "id").values_list("id", flat=True))
+        self.assertEqual(page_through({"pagination": "cursor", "page_size": 4, "q": "paged"}), paged)
+
+        third = list(Term.objects.filter(tags__name="third").order_by("term", "id").values_list("id", flat=True))
+        self.assertEqual(page_through({"pagination": "cursor", "page_size": 3, "tags": "third"}), third)
+
+        with self.settings(WAGTAILTERMS={"pagination": "cursor"}):
+            self.assertEqual(page_through({"page_size": 100}), expected)
+
+        # an invalid cursor starts from the beginning
+        response = self.client.get(reverse("wagtailterms:terms-list"), {"cursor": "invalid", "page_size": 2})
+        self.assertEqual([term["id"] for term in response.data["results"]], expected[:2])
+
+    def test_definition_excerpt(self):
+        """Test that the plain text excerpt of the definition is kept up to date when a term is saved"""
+        term = Term.objects.create(term="Excerpt", definition=f"<p>Long &amp; {'word ' * 50}</p>", live=True)
+        self.assertTrue(term.excerpt.startswith("Long & word word"))
+        self.assertEqual(len(term.excerpt), 150)
+        self.assertTrue(term.excerpt.endswith("…"))
+
+        term.definition = "<p>Short</p>"
+        term.save_revision().publish()
+        term.refresh_from_db()
+        self.assertEqual(term.excerpt, "Short")
+
+    def test_fields_and_definition_modes(self):
+        """Test that fields and definition limit the returned fields and the columns loaded from the database"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self.term1.definition = "<p>A <b>bold</b> definition</p>"
+        self.term1.save()
+        url = reverse("wagtailterms:terms-detail", args=[self.term1.id])
+
+        response = self.client.get(url, {"definition": "excerpt"})
+        self.assertEqual(response.data["definition"], "A bold definition")
+        self.assertEqual(set(response.data), {"id", "term", "definition", "tags"})
+
+        response = self.client.get(url, {"definition": "text"})
+        self.assertEqual(response.data["definition"], "A bold definition")
+
+        response = self.client.get(url, {"definition": "none"})
+        self.assertEqual(set(response.data), {"id", "term", "tags"})
+
+        response = self.client.get(url, {"fields": "id,term"})
+        self.assertEqual(response.data, {"id": self.term1.id, "term": "Test Term"})
+
+        response = self.client.get(url, {"definition": "invalid"})
+        self.assertEqual(response.data["definition"], "<p>A <b>bold</b> definition</p>")
+
+        # the definition column isn't loaded unless the definition is needed
+        for params in [{"definition": "excerpt"}, {"fields": "id,term,tags"}]:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(reverse("wagtailterms:terms-list"), params)
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse(any('"definition"' in query["sql"] for query in queries))
+
+        response = self.client.get(reverse("wagtailterms:terms-list"), {"definition": "excerpt", "q": "bold"})
+        self.assertEqual(response.data["results"][0]["definition"], "A bold definition")
+
+    def create_tagged_terms(self, count):
+        """Create live terms with two tags each through the bulk importer, which also indexes them for search"""
+        from .importexport import TermImporter
+
+        TermImporter().import_terms(
+            {
+                "term": f"Budget {i}",
+                "definition": f"<p>Budget definition {i}</p>",
+                "tags": [f"tag{i % 20}", "budget"],
+                "live": True,
+            }
+            for i in range(Term.objects.count(), count)
+        )
+
+    def test_query_budgets(self):
+        """Test that the terms api makes the same number of queries however many terms there are"""
+        from .cache import GLOSSARY_VERSION_CACHE_KEY, bump_version
+
+        list_url = reverse("wagtailterms:terms-list")
+        budgets = [
+            ("list", list_url, {"page_size": 100}, 3),
+            ("cursor list", list_url, {"pagination": "cursor", "page_size": 100}, 2),
+            ("search", list_url, {"q": "budget", "page_size": 100}, 3),
+            ("tag filter", list_url, {"tags": ["budget", "tag3"], "page_size": 100}, 4),
+            ("batch", list_url, {"ids": ",".join(str(i) for i in range(1, 101))}, 2),
+            ("detail", reverse("wagtailterms:terms-detail", args=[self.term1.id]), {}, 2),
+            # the group membership check is cached after the first request
+            ("tags", reverse("wagtailterms:terms-tags"), {}, 1),
+        ]
+
+        self.client.force_authenticate(self.editor_user)
+        self.client.get(reverse("wagtailterms:terms-tags"))
+        for count in [10, 1000]:
+            self.create_tagged_terms(count)
+            self.assertEqual(Term.objects.count(), count)
+            for name, url, params, budget in budgets:
+                # a new glossary version changes the ETag, so no response is answered as not modified. Cached
+                # definitions are kept, they are only rendered again when the definition of their term changes.
+                bump_version(GLOSSARY_VERSION_CACHE_KEY)
+                with self.subTest(name, count=count), self.assertNumQueries(budget):
+                    response = self.client.get(url, params)
+                    self.assertEqual(response.status_code, 200)
+
+    def test_server_timing(self):
+        """Test that the phases of api requests are timed when the server_timing setting is enabled"""
+        url = reverse("wagtailterms:terms-list")
+        response = self.client.get(url)
+        self.assertNotIn("Server-Timing", response)
+
+        with self.settings(WAGTAILTERMS={"server_timing": True}):
+            with self.assertLogs("wagtailterms.timing", "INFO") as logs:
+                response = self.client.get(url, {"q": "xuqwn"})
+                not_modified = self.client.get(url, {"q": "xuqwn"}, HTTP_IF_NONE_MATCH=response["ETag"])
+                detail = self.client.get(reverse("wagtailterms:terms-detail", args=[self.term1.id]))
+
+        metrics = [metric.split(";")[0] for metric in response["Server-Timing"].split(", ")]
+        self.assertEqual(metrics, ["search", "serialize", "definition", "render", "total"])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified["Server-Timing"].split(";")[0], "total")
+        self.assertEqual([metric.split(";")[0] for metric in detail["Server-Timing"].split(", ")][:2], ["db", "serialize"])
+
+        timing = logs.records[0].wagtailterms_timing
+        self.assertEqual(timing["action"], "list")
+        self.assertEqual(timing["status"], 200)
+        self.assertEqual(set(timing["phases"]), {"search", "serialize", "definition", "render"})
+        self.assertGreater(timing["phases"]["search"]["queries"], 0)
+        self.assertEqual(timing["queries"], sum(
+            phase["queries"] for name, phase in timing["phases"].items() if name != "definition"
+        ))
+
+    def test_tag_groups_permission_cache(self):
+        """Test that group membership is cached for the tags endpoint and checked again when it changes"""
+        url = reverse("wagtailterms:terms-tags")
+        self.client.login(username="user", password="pass")
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        # the membership query only runs for the first request
+        with self.assertNumQueries(2):
+            # session and user
+            self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.normal_user.groups.add(self.editor_group)
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+        self.editor_group.user_set.remove(self.normal_user)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        reviewers = Group.objects.create(name="Reviewers")
+        self.normal_user.groups.add(reviewers)
+        self.assertEqual(self.client.get(url).status_code, 403)
+        with self.settings(WAGTAILTERMS={"tag_groups": ["Reviewers"]}):
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+            reviewers.delete()
+            self.assertEqual(self.client.get(url).status_code, 403)
+
+    def test_glossary_version_in_template(self):
+        """Test that the tooltip template stamps the terms it stores in the browser with the glossary version"""
+        from django.template.loader import render_to_string
+        from .cache import get_glossary_version
+
+        version = str(get_glossary_version())
+        self.assertIn(f'const WAGTAIL_TERMS_VERSION = "{version}";', render_to_string("wagtailterms/wagtailterms.html"))
+
+        # publishing a term changes the version, so the stored terms are thrown away
+        with self.captureOnCommitCallbacks(execute=True):
+            self.term1.save_revision().publish()
+        self.assertNotIn(version, render_to_string("wagtailterms/wagtailterms.html"))
+
+    def test_class_style_mode(self):
+        """Test that terms can be saved with a class and styled by the generated stylesheet"""
+        from django.template import Context, Template
+        from wagtail.admin.rich_text.converters.contentstate import ContentstateConverter
+        from .autolink import render_term
+
+        style = "text-decoration-line: underline; text-decoration-color: green;text-decoration-thickness: 3px;color:green;"
+        html = f'<p><span style="{style}" data-term="{self.term1.id}">Test Term</span></p>'
+        converter = ContentstateConverter(features=["term"])
+
+        with self.settings(WAGTAILTERMS={"style_mode": "class"}):
+            self.assertIn(
+                f'<span class="wagtailterm" data-term="{self.term1.id}">Test Term</span>',
+                converter.to_database_format(converter.from_database_format(html)),
+            )
+            self.assertEqual(render_term(self.term1.id, "x"), f'<span class="wagtailterm" data-term="{self.term1.id}">x</span>')
+
+            response = self.client.get(reverse("wagtailterms:terms-stylesheet"))
+            self.assertEqual(response["Content-Type"], "text/css")
+            self.assertEqual(response.content.decode(), f".wagtailterm {{ {style} }}\n")
+            response = self.client.get(reverse("wagtailterms:terms-stylesheet"), HTTP_IF_NONE_MATCH=response["ETag"])
+            self.assertEqual(response.status_code, 304)
+
+            self.assertEqual(
+                Template("{% load wagtailterms_tags %}{% wagtailterms_stylesheet %}").render(Context()),
+                f'<link rel="stylesheet" href="{reverse("wagtailterms:terms-stylesheet")}">',
+            )
+
+        # the inline style is kept by default
+        self.assertIn(
+            f'<span style="{style}" data-term="{self.term1.id}">Test Term</span>',
+            converter.to_database_format(converter.from_database_format(html)),
+        )
+        self.assertEqual(Template("{% load wagtailterms_tags %}{% wagtailterms_stylesheet %}").render(Context()), "")
+
+    def test_rewrite_spans_command(self):
+        """Test that saved term spans are rewritten for the current style settings"""
+        import json
+        from io import StringIO
+        from wagtail.models import Revision
+        from .restyle import rewrite_value
+
+        style = "text-decoration-line: underline; text-decoration-color: green;text-decoration-thickness: 3px;color:green;"
+        inline = f'<p>See <span style="{style}" data-term="{self.term2.id}">term 2</span></p>'
+        styled = f'<p>See <span class="wagtailterm" data-term="{self.term2.id}">term 2</span></p>'
+
+        self.term1.definition = inline
+        self.term1.save_revision().publish()
+
+        with self.settings(WAGTAILTERMS={"style_mode": "class"}):
+            output = StringIO()
+            call_command("wagtailterms_rewrite_spans", "--dry-run", stdout=output)
+            self.assertIn("Would rewrite the term spans of 1 wagtailterms.Term rows", output.getvalue())
+            self.term1.refresh_from_db()
+            self.assertEqual(self.term1.definition, inline)
+
+            call_command("wagtailterms_rewrite_spans", "--batch-size", "1", stdout=StringIO())
+            self.term1.refresh_from_db()
+            self.assertEqual(self.term1.definition, styled)
+            self.assertEqual(Revision.objects.get(pk=self.term1.latest_revision_id).content["definition"], styled)
+
+            # StreamField values stored as json inside revision content are rewritten too
+            stream = json.dumps([{"type": "paragraph", "value": inline, "id": "1"}])
+            self.assertEqual(json.loads(rewrite_value({"content": stream})["content"])[0]["value"], styled)
+
+            # running it again finds nothing to do
+            output = StringIO()
+            call_command("wagtailterms_rewrite_spans", stdout=output)
+            self.assertIn("No term spans needed rewriting", output.getvalue())
+
+        # changing the settings back restores the inline style
+        call_command("wagtailterms_rewrite_spans", stdout=StringIO())
+        self.term1.refresh_from_db()
+        self.assertEqual(self.term1.definition, inline)
+
+    def test_rewrite_page_spans(self):
+        """Test that the term spans of pages, their StreamField blocks and their draft revisions are rewritten"""
+        from io import StringIO
+        from django.apps import apps
+        from wagtail.models import Page, Revision
+        from wagtail.rich_text import RichText
+
+        style = "text-decoration-line: underline; text-decoration-color: green;text-decoration-thickness: 3px;color:green;"
+        inline = f'<p>See <span style="{style}" data-term="{self.term2.id}">term 2</span></p>'
+        styled = f'<p>See <span class="wagtailterm" data-term="{self.term2.id}">term 2</span></p>'
+
+        root = Page.objects.get(depth=1)
+        basic_page = root.add_child(instance=apps.get_model("home", "BasicPage")(
+            title="Basic", slug="basic", content=inline,
+        ))
+        advanced_page = root.add_child(instance=apps.get_model("home", "AdvancedPage")(
+            title="Advanced", slug="advanced", content=[("heading", "Terms"), ("paragraph", RichText(inline))],
+        ))
+        basic_page.save_revision().publish()
+        advanced_page.save_revision().publish()
+        # a draft that is only in a revision
+        basic_page.content = inline + "<p>Draft</p>"
+        draft = basic_page.save_revision()
+
+        with self.settings(WAGTAILTERMS={"style_mode": "class"}):
+            output = StringIO()
+            call_command("wagtailterms_rewrite_spans", "--no-revisions", stdout=output)
+            self.assertIn("Rewrote the term spans of 1 home.BasicPage rows", output.getvalue())
+            self.assertIn("Rewrote the term spans of 1 home.AdvancedPage rows", output.getvalue())
+            self.assertEqual(Page.objects.get(pk=basic_page.pk).specific.content, styled)
+            stream = Page.objects.get(pk=advanced_page.pk).specific.content
+            self.assertEqual(stream[0].value, "Terms")
+            self.assertEqual(stream[1].value.source, styled)
+            draft.refresh_from_db()
+            self.assertEqual(draft.content["content"], inline + "<p>Draft</p>")
+
+            call_command("wagtailterms_rewrite_spans", stdout=StringIO())
+            draft.refresh_from_db()
+            self.assertEqual(draft.content["content"], styled + "<p>Draft</p>")
+            # StreamField values are saved in revisions as a string of json
+            revision = Revision.objects.get(pk=advanced_page.latest_revision_id)
+            self.assertEqual(revision.as_object().content[1].value.source, styled)
+            revision = Revision.objects.get(pk=basic_page.latest_revision_id)
+            self.assertEqual(revision.as_object().content, styled + "<p>Draft</p>")
+
+    def test_term_usage(self):
+        """Test that the objects linking each term are indexed when they are published and can be listed"""
+        from io import StringIO
+        from .models import TermUsage
+
+        span = '<span data-term="{}">term</span>'
+        self.term1.definition = f"<p>{span.format(self.term2.id)} and {span.format(self.term3.id)}</p>"
+        self.term1.save_revision().publish()
+        self.assertEqual(
+            set(TermUsage.objects.filter(object_id=str(self.term1.id)).values_list("term_id", flat=True)),
+            {self.term2.id, self.term3.id},
+        )
+
+        # drafts aren't indexed until they are published, then only the changes are saved
+        self.term1.definition = f"<p>{span.format(self.term2.id)} and {span.format(99999)}</p>"
+        self.term1.save_revision()
+        self.assertEqual(TermUsage.objects.filter(term=self.term3).count(), 1)
+        self.term1.save_revision().publish()
+        self.assertEqual(list(TermUsage.objects.values_list("term_id", flat=True)), [self.term2.id])
+
+        # the api lists the objects linking a term to editors
+        url = reverse("wagtailterms:terms-usage", args=[self.term2.id])
+        self.client.login(username="user", password="pass")
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.client.login(username="editor", password="pass")
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(response.data["results"][0]["type"], "wagtailterms.term")
+        self.assertEqual(response.data["results"][0]["id"], str(self.term1.id))
+        self.assertEqual(response.data["results"][0]["title"], "Test Term")
+        # the edit url is only given to users who can edit the object
+        self.assertIsNone(response.data["results"][0]["admin_url"])
+        self.client.login(username="admin", password="pass")
+        self.assertEqual(
+            self.client.get(url).data["results"][0]["admin_url"],
+            reverse("wagtailsnippets_wagtailterms_term:edit", args=[self.term1.id]),
+        )
+
+        # unpublished objects aren't live, so they are left out
+        self.term1.unpublish()
+        self.assertFalse(TermUsage.objects.exists())
+
+        # the index can be rebuilt from the live content, without the terms linked by drafts
+        self.term1.save_revision().publish()
+        self.term4.definition = span.format(self.term3.id)
+        self.term4.save()
+        TermUsage.objects.all().delete()
+        output = StringIO()
+        call_command("wagtailterms_rebuild_term_usage", "--batch-size", "1", stdout=output)
+        self.assertIn("Indexed 1 term usages", output.getvalue())
+        self.assertEqual(list(TermUsage.objects.values_list("term_id", flat=True)), [self.term2.id])
+
+        # deleting either side removes the usage
+        self.term2.delete()
+        self.assertFalse(TermUsage.objects.exists())
+
+    def test_term_usage_permission(self):
+        """Test that the usage endpoint is for users who can access the admin, whatever the tag groups are"""
+        from django.contrib.auth.models import Permission
+
+        url = reverse("wagtailterms:terms-usage", args=[self.term1.id])
+        self.client.login(username="user", password="pass")
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.normal_user.user_permissions.add(Permission.objects.get(codename="access_admin"))
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+        # being in a tag group doesn't give access to it
+        with override_settings(WAGTAILTERMS={'tag_groups': ['Tag readers']}):
+            reader = get_user_model().objects.create_user("reader", password="pass")
+            reader.groups.add(Group.objects.create(name="Tag readers"))
+            self.client.login(username="reader", password="pass")
+            self.assertEqual(self.client.get(reverse("wagtailterms:terms-tags")).status_code, 200)
+            self.assertEqual(self.client.get(url).status_code, 403)
+
+    def test_page_term_usage(self):
+        """Test that pages linking terms in a rich text field or a StreamField block are indexed and listed"""
+        from django.apps import apps
+        from wagtail.models import Page
+        from wagtail.rich_text import RichText
+        from .models import TermUsage
+
+        span = '<span data-term="{}">term</span>'
+        root = Page.objects.get(depth=1)
+        basic_page = root.add_child(instance=apps.get_model("home", "BasicPage")(
+            title="Basic", slug="basic", content=f"<p>{span.format(self.term1.id)}</p>", live=False,
+        ))
+        advanced_page = root.add_child(instance=apps.get_model("home", "AdvancedPage")(
+            title="Advanced", slug="advanced", live=False, content=[
+                ("heading", "Terms"),
+                ("paragraph", RichText(f"<p>{span.format(self.term1.id)} {span.format(self.term2.id)}</p>")),
+            ],
+        ))
+        # pages are indexed when they are published, by their base content type
+        self.assertFalse(TermUsage.objects.exists())
+        basic_page.save_revision().publish()
+        advanced_page.save_revision().publish()
+        self.assertEqual(
+            set(TermUsage.objects.values_list("term_id", "content_type__model", "object_id")),
+            {
+                (self.term1.id, "page", str(basic_page.id)),
+                (self.term1.id, "page", str(advanced_page.id)),
+                (self.term2.id, "page", str(advanced_page.id)),
+            },
+        )
+
+        self.client.login(username="admin", password="pass")
+        response = self.client.get(reverse("wagtailterms:terms-usage", args=[self.term1.id]))
+        self.assertEqual(response.data["count"], 2)
+        self.assertEqual(
+            {(result["type"], result["title"]) for result in response.data["results"]},
+            {("wagtailcore.page", "Basic"), ("wagtailcore.page", "Advanced")},
+        )
+        self.assertEqual(
+            {result["admin_url"] for result in response.data["results"]},
+            {reverse("wagtailadmin_pages:edit", args=[page.id]) for page in (basic_page, advanced_page)},
+        )
+
+        # the rebuilt index reads the rich text and StreamField columns of every page model
+        TermUsage.objects.all().delete()
+        call_command("wagtailterms_rebuild_term_usage", verbosity=0)
+        self.assertEqual(TermUsage.objects.filter(object_id=str(advanced_page.id)).count(), 2)
+        self.assertEqual(TermUsage.objects.filter(object_id=str(basic_page.id)).count(), 1)
+
+        # removing the block removes its usages when the page is published again
+        advanced_page.content = [("heading", "No terms")]
+        advanced_page.save_revision().publish()
+        self.assertFalse(TermUsage.objects.filter(object_id=str(advanced_page.id)).exists())
+
+    def test_tooltips_tag(self):
+        """Test that the tooltip scripts are served deferred from the static files and only on pages with terms"""
+        from django.template import Context, Template
+        from django.templatetags.static import static
+        from django.utils.safestring import mark_safe
+
+        template = Template("{% load wagtailterms_tags %}{% wagtailterms_tooltips content %}")
+
+        html = template.render(Context({"content": mark_safe(f'<p><span data-term="{self.term1.id}">t</span></p>')}))
+        # the batches of the tooltips are as large as the api allows
+        from .views import TermViewSet
+        self.assertIn(f"const WAGTAIL_TERMS_BATCH_SIZE = {TermViewSet.max_batch_size};", html)
+        self.assertIn(f'<script defer src="{static("wagtailterms/tippyjs.js")}"></script>', html)
+        self.assertIn(f'<script defer src="{static("wagtailterms/popperjs.js")}"></script>', html)
+        self.assertNotIn("unpkg.com", html)
+
+        self.assertEqual(template.render(Context({"content": "<p>No terms here</p>"})).strip(), "")
+        self.assertEqual(template.render(Context({"content": None})).strip(), "")
+
+        # without content to check, the scripts are always added
+        html = Template("{% load wagtailterms_tags %}{% wagtailterms_tooltips %}").render(Context({}))
+        self.assertIn("tippyjs.js", html)
+
+    def test_tooltips_tag_with_stream_field(self):
+        """Test that the terms of StreamField and rich text values are found from their data without rendering them"""
+        from unittest import mock
+        from django.apps import apps
+        from django.template import Context, Template
+        from wagtail.blocks import StreamValue
+        from wagtail.rich_text import RichText
+
+        span = f'<p><span data-term="{self.term1.id}">t</span></p>'
+        page_model = apps.get_model("home", "AdvancedPage")
+        with_terms = page_model(content=[("heading", "Terms"), ("paragraph", RichText(span))]).content
+        without_terms = page_model(content=[("heading", "data-term"), ("paragraph", RichText("<p>None</p>"))]).content
+
+        tooltips = Template("{% load wagtailterms_tags %}{% wagtailterms_tooltips content %}")
+        payload = Template("{% load wagtailterms_tags %}{% wagtailterms_payload content %}")
+        with mock.patch.object(StreamValue, "__str__", side_effect=AssertionError("rendered")), \
+                mock.patch.object(RichText, "__str__", side_effect=AssertionError("rendered")):
+            self.assertIn("tippyjs.js", tooltips.render(Context({"content": with_terms})))
+            self.assertIn("tippyjs.js", tooltips.render(Context({"content": RichText(span)})))
+            self.assertEqual(tooltips.render(Context({"content": without_terms})).strip(), "")
+            self.assertIn('"Test Term"', payload.render(Context({"content": with_terms})))
+
+    def test_tags_cursor_pagination(self):
+        """Test that the tags endpoint can be paged through with a cursor without repeating or skipping tags"""
+        self.client.login(username="editor", password="pass")
+
+        # lots of tags with the same count so that the order depends on the tag name
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(120):
+                self.term1.tags.add(f"tag{i}")
+            self.term1.save()
+            self.term2.tags.add("tag7", "tag99")
+            self.term2.save()
+
+        names = []
+        cursor = None
+        pages = 0
+        while True:
+            url = reverse("wagtailterms:terms-tags")
+            if cursor:
+                url += f"?cursor={cursor}"
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            names += [tag["name"] for tag in response.data["tags"]]
+            pages += 1
+            cursor = response.data["next"]
+            self.assertEqual(response.data["hasMore"], cursor is not None)
+            if not cursor:
+                break
+
+        self.assertEqual(pages, 3)
+        self.assertEqual(len(names), 120)
+        self.assertEqual(len(set(names)), 120)
+        # most used tags come first, then tags are ordered by name
+        self.assertEqual(names[:3], ["tag7", "tag99", "tag0"])
+
+        # an invalid cursor starts from the beginning
+        response = self.client.get(f"{reverse('wagtailterms:terms-tags')}?cursor=invalid")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["tags"][0]["name"], "tag7")
+
     def test_tags_endpoint_permissions(self):
         """Test that the tags endpoint respects permission settings with explicit group membership checks"""
         # Anonymous user should not have access
@@ -538,6 +1480,272 @@ class TestTermEntity(APITestCase):
             response = self.client.get(reverse("wagtailterms:terms-tags"))
             self.assertEqual(response.status_code, 404)
 
+    def test_editor_conversion_loads_terms_in_bulk(self):
+        """Test that converting html to contentstate fetches every term in the document together"""
+        import json
+        from wagtail.admin.rich_text.converters.contentstate import ContentstateConverter
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.term1.tags.add("tag1")
+            self.term1.save()
+
+        spans = "".join(
+            f'<span data-term="{term_id}">term</span> '
+            for term_id in [self.term1.id, self.term2.id, self.term1.id, 99999] * 50
+        )
+        converter = ContentstateConverter(features=["term"])
+
+        # one query for the term names no matter how many terms the document has
+        with self.assertNumQueries(1):
+            contentstate = json.loads(converter.from_database_format(f"<p>{spans}</p>"))
+
+        entities = list(contentstate["entityMap"].values())
+        self.assertEqual(len(entities), 200)
+        self.assertEqual(entities[0]["type"], "TERM")
+        # the definition and tags are loaded by the editor when the term is hovered
+        self.assertEqual(entities[0]["data"]["term"], {"term": "Test Term", "id": self.term1.id})
+        self.assertEqual(entities[1]["data"]["term"]["id"], self.term2.id)
+        self.assertEqual(entities[2]["data"]["term"]["id"], self.term1.id)
+        # deleted terms are still shown in the editor
+        self.assertEqual(entities[3]["data"]["term"]["id"], 0)
+
+    def test_definition_is_rendered_once_per_change(self):
+        """Test that rendered definitions are cached until the live definition of their term changes"""
+        from unittest import mock
+        from wagtail.templatetags.wagtailcore_tags import richtext
+        from .cache import definition_cache, get_cache, get_definition_cache_key, render_definition
+
+        definition_cache.clear()
+        get_cache().clear()
+        with mock.patch("wagtailterms.cache.richtext", wraps=richtext) as mock_richtext:
+            term = Term.objects.get(pk=self.term1.pk)
+            self.assertEqual(render_definition(term), "Definition with special keyword xuqwn")
+            self.assertEqual(render_definition(term), "Definition with special keyword xuqwn")
+            self.client.get(reverse("wagtailterms:terms-list"))
+            self.client.get(reverse("wagtailterms:terms-list"))
+            # every term was rendered once, the rest came from the cache
+            self.assertEqual(mock_richtext.call_count, 3)
+
+            # the shared cache is used when the in-process cache doesn't have the definition
+            definition_cache.clear()
+            render_definition(term)
+            self.assertEqual(mock_richtext.call_count, 3)
+
+            # a draft doesn't change the live definition
+            self.term1.definition = "Changed definition"
+            with self.captureOnCommitCallbacks(execute=True):
+                revision = self.term1.save_revision()
+            self.assertEqual(render_definition(Term.objects.get(pk=self.term1.pk)), "Definition with special keyword xuqwn")
+            key = get_definition_cache_key(self.term1.pk)
+            stale = definition_cache.get(key)
+            self.assertIsNotNone(stale)
+
+            # changes to other terms don't render it again
+            with self.captureOnCommitCallbacks(execute=True):
+                self.term2.save_revision().publish()
+            render_definition(Term.objects.get(pk=self.term1.pk))
+            self.assertEqual(mock_richtext.call_count, 3)
+
+            # publishing renders the definition again, also in processes that still have the old one in memory
+            with self.captureOnCommitCallbacks(execute=True):
+                revision.publish()
+            definition_cache.set(key, stale)
+            get_cache().set(key, stale)
+            self.assertEqual(render_definition(Term.objects.get(pk=self.term1.pk)), "Changed definition")
+
+    def test_glossary_version_ignores_drafts_and_locks(self):
+        """Test that saving a draft or locking a term doesn't change the glossary version"""
+        from .cache import get_glossary_version
+
+        version = get_glossary_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.term1.definition = "<p>Draft</p>"
+            self.term1.save_revision()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.term1.locked = True
+            self.term1.locked_by = self.admin_user
+            self.term1.save(update_fields=["locked", "locked_by", "locked_at"])
+        self.assertEqual(get_glossary_version(), version)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.term1.save_revision().publish()
+        self.assertNotEqual(get_glossary_version(), version)
+
+    def test_lru_cache(self):
+        """Test that the in-process cache forgets the least recently used definitions"""
+        from .cache import LRUCache
+
+        cache = LRUCache(2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.set("c", 3)
+        # b was used least recently so it was removed
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(len(cache), 2)
+
+        cache.delete("a")
+        self.assertIsNone(cache.get("a"))
+
+    def test_conditional_requests(self):
+        """Test that the terms api answers conditional requests with 304 when nothing has changed"""
+        for url in [reverse("wagtailterms:terms-list"), reverse("wagtailterms:terms-detail", args=[self.term1.id])]:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            etag = response["ETag"]
+
+            # the client's copy is current so nothing is queried or serialized
+            with self.assertNumQueries(0):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response["ETag"], etag)
+
+            # dates only have whole seconds, so they aren't used to tell whether the glossary changed
+            self.assertNotIn("Last-Modified", response)
+            response = self.client.get(url, HTTP_IF_MODIFIED_SINCE="Sat, 01 Jan 2050 00:00:00 GMT")
+            self.assertEqual(response.status_code, 200)
+
+            # changing a term changes the version of the glossary once the change is committed
+            with self.captureOnCommitCallbacks(execute=True):
+                self.term1.tags.add("new-tag")
+                self.term1.save()
+                self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response["ETag"], etag)
+
+        # each query string has its own etag
+        response = self.client.get(f"{reverse('wagtailterms:terms-list')}?q=Special")
+        self.assertNotEqual(response["ETag"], self.client.get(reverse("wagtailterms:terms-list"))["ETag"])
+
+    @override_settings(WAGTAILTERMS={'conditional_requests': False})
+    def test_conditional_requests_disabled(self):
+        """Test that conditional requests can be turned off"""
+        response = self.client.get(reverse("wagtailterms:terms-list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("ETag", response)
+
+    @override_settings(
+        WAGTAILTERMS={'cache_control': {'max_age': 60, 's_maxage': 3600}},
+        WAGTAILFRONTENDCACHE={'test': {'BACKEND': 'wagtailterms.testing.RecordingFrontendCacheBackend'}},
+    )
+    def test_frontend_cache(self):
+        """Test that anonymous responses can be cached by a CDN and are purged when a term changes"""
+        from wagtail.models import Site
+        from .testing import RecordingFrontendCacheBackend
+
+        response = self.client.get(reverse("wagtailterms:terms-list"))
+        self.assertIn("public", response["Cache-Control"])
+        self.assertIn("s-maxage=3600", response["Cache-Control"])
+        self.assertIn("max-age=60", response["Cache-Control"])
+        response = self.client.get(reverse("wagtailterms:terms-detail", args=[self.term1.id]))
+        self.assertIn("s-maxage=3600", response["Cache-Control"])
+
+        # urls with a query string aren't purged, so shared caches keep them as long as browsers do
+        response = self.client.get(reverse("wagtailterms:terms-list"), {"ids": self.term1.id})
+        self.assertIn("s-maxage=60", response["Cache-Control"])
+        # unless they are for the current glossary version, whose urls change with the next change
+        from .cache import get_glossary_version
+        version = str(get_glossary_version())
+        response = self.client.get(reverse("wagtailterms:terms-list"), {"ids": self.term1.id, "v": version})
+        self.assertIn("s-maxage=3600", response["Cache-Control"])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.term1.save_revision().publish()
+        response = self.client.get(reverse("wagtailterms:terms-list"), {"ids": self.term1.id, "v": version})
+        self.assertIn("s-maxage=60", response["Cache-Control"])
+
+        # responses for logged in users are never shared
+        self.client.login(username="editor", password="pass")
+        response = self.client.get(reverse("wagtailterms:terms-list"))
+        self.assertNotIn("public", response.get("Cache-Control", ""))
+        response = self.client.get(reverse("wagtailterms:terms-tags"))
+        self.assertNotIn("public", response.get("Cache-Control", ""))
+
+        RecordingFrontendCacheBackend.purged_urls.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.term1.save_revision().publish()
+            # nothing is purged before the new version is committed
+            self.assertEqual(RecordingFrontendCacheBackend.purged_urls, [])
+
+        root_url = Site.objects.get(is_default_site=True).root_url
+        self.assertIn(root_url + reverse("wagtailterms:terms-list"), RecordingFrontendCacheBackend.purged_urls)
+        self.assertIn(
+            root_url + reverse("wagtailterms:terms-detail", args=[self.term1.id]),
+            RecordingFrontendCacheBackend.purged_urls,
+        )
+        self.assertIn(root_url + reverse("wagtailterms:terms-tags"), RecordingFrontendCacheBackend.purged_urls)
+
+        RecordingFrontendCacheBackend.purged_urls.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.term2.unpublish()
+        self.assertIn(
+            root_url + reverse("wagtailterms:terms-detail", args=[self.term2.id]),
+            RecordingFrontendCacheBackend.purged_urls,
+        )
+
+        RecordingFrontendCacheBackend.purged_urls.clear()
+        term3_id = self.term3.id
+        with self.captureOnCommitCallbacks(execute=True):
+            self.term3.delete()
+        self.assertIn(
+            root_url + reverse("wagtailterms:terms-detail", args=[term3_id]),
+            RecordingFrontendCacheBackend.purged_urls,
+        )
+
+    @override_settings(
+        WAGTAILTERMS={'purge_term_pages': True},
+        WAGTAILFRONTENDCACHE={'test': {'BACKEND': 'wagtailterms.testing.RecordingFrontendCacheBackend'}},
+    )
+    def test_purge_term_pages(self):
+        """Test that the pages linking a term are purged once a change to the term is committed"""
+        from django.apps import apps
+        from wagtail.models import Site
+        from .testing import RecordingFrontendCacheBackend
+
+        home = Site.objects.get(is_default_site=True).root_page
+        page = home.add_child(instance=apps.get_model("home", "BasicPage")(
+            title="Basic", slug="basic", content=f'<p><span data-term="{self.term1.id}">term</span></p>',
+        ))
+        page.save_revision().publish()
+        page_url = page.full_url
+
+        RecordingFrontendCacheBackend.purged_urls.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.term1.save_revision().publish()
+            self.assertEqual(RecordingFrontendCacheBackend.purged_urls, [])
+        self.assertIn(page_url, RecordingFrontendCacheBackend.purged_urls)
+
+        # the pages of a deleted term are found before its usages are deleted with it
+        RecordingFrontendCacheBackend.purged_urls.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.term1.delete()
+            self.assertEqual(RecordingFrontendCacheBackend.purged_urls, [])
+        self.assertIn(page_url, RecordingFrontendCacheBackend.purged_urls)
+
+    @override_settings(WAGTAILFRONTENDCACHE={'test': {'BACKEND': 'wagtailterms.testing.RecordingFrontendCacheBackend'}})
+    def test_frontend_cache_disabled(self):
+        """Test that responses are not cached or purged unless the cache_control setting is set"""
+        from .testing import RecordingFrontendCacheBackend
+
+        response = self.client.get(reverse("wagtailterms:terms-list"))
+        self.assertNotIn("public", response.get("Cache-Control", ""))
+
+        RecordingFrontendCacheBackend.purged_urls.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.term1.save_revision().publish()
+        self.assertEqual(RecordingFrontendCacheBackend.purged_urls, [])
+
+    def test_editor_js(self):
+        """Test that the editor script gets the api path and the batch size of the terms api"""
+        from .views import TermViewSet
+        from .wagtail_hooks import editor_js
+
+        script = editor_js()
+        self.assertIn(f'const WAGTAIL_TERM_PATH = "{reverse("wagtailterms:terms-list")}";', script)
+        self.assertIn(f"const WAGTAIL_TERM_BATCH_SIZE = {TermViewSet.max_batch_size};", script)
+
     def test_termviewset_panels(self):
         """Test that TermViewSet panels are correctly configured based on disable_tags setting"""
         from wagtailterms.wagtail_hooks import TermViewSet
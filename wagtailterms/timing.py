@@ -0,0 +1,95 @@
+import logging
+import time
+from contextlib import contextmanager, nullcontext
+
+from django.db import connection
+
+logger = logging.getLogger("wagtailterms.timing")
+
+
+class RequestTimer:
+    """
+    Times the phases of a terms api request and counts the queries made in each of them, for the `Server-Timing`
+    header and the timing log record. Phases can be nested, e.g. rendering definitions happens while serializing.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        # phase name -> [milliseconds, queries], in the order the phases started
+        self.phases = {}
+        self.active = []
+        self.queries = 0
+
+    @contextmanager
+    def phase(self, name):
+        timing = self.phases.setdefault(name, [0.0, 0])
+        self.active.append(timing)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            timing[0] += (time.perf_counter() - start) * 1000
+            self.active.pop()
+
+    def count_query(self, execute, sql, params, many, context):
+        self.queries += 1
+        for timing in self.active:
+            timing[1] += 1
+        return execute(sql, params, many, context)
+
+    def count_queries(self):
+        return connection.execute_wrapper(self.count_query)
+
+    def get_total(self):
+        return (time.perf_counter() - self.start) * 1000
+
+    def get_header(self, total):
+        metrics = [
+            f'{name};dur={milliseconds:.2f};desc="{queries} queries"'
+            for name, (milliseconds, queries) in self.phases.items()
+        ]
+        metrics.append(f'total;dur={total:.2f};desc="{self.queries} queries"')
+        return ", ".join(metrics)
+
+    def report(self, request, response, action):
+        """
+        Add the `Server-Timing` header to the response and log the timings.
+        """
+        total = self.get_total()
+        response["Server-Timing"] = self.get_header(total)
+        logger.info(
+            "%s %s %s %.2fms %d queries", request.method, request.get_full_path(), response.status_code, total,
+            self.queries,
+            extra={"wagtailterms_timing": {
+                "method": request.method,
+                "path": request.get_full_path(),
+                "action": action,
+                "status": response.status_code,
+                "total_ms": round(total, 3),
+                "queries": self.queries,
+                "phases": {
+                    name: {"ms": round(milliseconds, 3), "queries": queries}
+                    for name, (milliseconds, queries) in self.phases.items()
+                },
+            }},
+        )
+
+
+class NullTimer:
+    """
+    Stands in for `RequestTimer` when timing is turned off, so that timed code doesn't need to check the setting.
+    """
+    context = nullcontext()
+
+    def phase(self, name):
+        return self.context
+
+
+NULL_TIMER = NullTimer()
+
+
+def get_timer(request):
+    """
+    Return the timer of a request, or a timer that does nothing when the request isn't timed.
+    """
+    return getattr(request, "wagtailterms_timer", NULL_TIMER)
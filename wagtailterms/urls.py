@@ -1,10 +1,13 @@
 from django.urls import path
-from .views import TermViewSet
+from .views import TermViewSet, stylesheet
 
 app_name = "wagtailterms"
 
 urlpatterns = [
     path("", TermViewSet.as_view({"get": "list"}), name="terms-list"),
     path("<int:pk>/", TermViewSet.as_view({"get": "retrieve"}), name="terms-detail"),
+    path("<int:pk>/usage/", TermViewSet.as_view({"get": "usage"}), name="terms-usage"),
     path("tags/", TermViewSet.as_view({"get": "tags"}), name="terms-tags"),
+    path("autocomplete/", TermViewSet.as_view({"get": "autocomplete"}), name="terms-autocomplete"),
+    path("style.css", stylesheet, name="terms-stylesheet"),
 ]
@@ -0,0 +1,82 @@
+import json
+from collections import defaultdict
+from itertools import islice
+
+from django.db import models, transaction
+from django.db.models.functions import Cast
+from wagtail.fields import StreamField
+from wagtail.models import DraftStateMixin
+
+from .models import Term, TermUsage
+from .utils import extract_term_ids, extract_term_ids_from_data, get_base_content_type, get_rich_text_models
+
+
+def rebuild_term_usage(batch_size=500):
+    """
+    Replace the term usage index with the terms linked by every live object with rich text or StreamField content,
+    reading and writing a batch of rows at a time. Return the number of usages in the index.
+
+    Only rows with `data-term` in them are loaded, and the index is replaced in one transaction so that it is never
+    seen empty.
+    """
+    term_ids = set(Term.objects.values_list("pk", flat=True))
+    with transaction.atomic():
+        TermUsage.objects.all().delete()
+        for model, fields in get_rich_text_models():
+            content_type = get_base_content_type(model)
+            stream_fields = {field for field in fields if isinstance(model._meta.get_field(field), StreamField)}
+
+            rows = model._base_manager.annotate(
+                **{f"{field}_text": Cast(field, models.TextField()) for field in fields}
+            )
+            condition = models.Q()
+            for field in fields:
+                # json columns are compared as text, their __contains lookup means json containment
+                condition |= models.Q(**{f"{field}_text__contains": "data-term"})
+            rows = rows.filter(condition)
+            if issubclass(model, DraftStateMixin):
+                # the table has the published content of live objects, the drafts are in revisions
+                rows = rows.filter(live=True)
+            rows = rows.order_by("pk").values_list("pk", *[f"{field}_text" for field in fields])
+            rows = rows.iterator(chunk_size=batch_size)
+
+            while batch := list(islice(rows, batch_size)):
+                usages = defaultdict(set)
+                for pk, *values in batch:
+                    for field, value in zip(fields, values):
+                        if value is None:
+                            continue
+                        if field in stream_fields:
+                            found = extract_term_ids_from_data(json.loads(value))
+                        else:
+                            found = extract_term_ids(value)
+                        # links to deleted terms are left out
+                        usages[str(pk)].update(found & term_ids)
+                # an object with rich text in more than one table is read once for each table, which finds its
+                # usages again
+                TermUsage.objects.bulk_create([
+                    TermUsage(term_id=term_id, content_type=content_type, object_id=object_id)
+                    for object_id, object_term_ids in usages.items()
+                    for term_id in object_term_ids
+                ], ignore_conflicts=True)
+    return TermUsage.objects.count()
+
+
+def get_usage_objects(usages):
+    """
+    Return the objects of a list of term usages in the same order, with one query for each content type.
+    Objects that no longer exist are None.
+    """
+    object_ids = defaultdict(set)
+    for usage in usages:
+        object_ids[usage.content_type_id].add(usage.object_id)
+
+    objects = {}
+    for usage in usages:
+        content_type = usage.content_type
+        if content_type.pk in objects:
+            continue
+        model = content_type.model_class()
+        found = model._default_manager.filter(pk__in=object_ids[content_type.pk]) if model else []
+        objects[content_type.pk] = {str(obj.pk): obj for obj in found}
+    return [objects[usage.content_type_id].get(usage.object_id) for usage in usages]
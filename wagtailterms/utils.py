@@ -0,0 +1,147 @@
+import re
+
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.utils.html import format_html, format_html_join
+from django.utils.text import Truncator
+from wagtail.fields import RichTextField, StreamField
+from wagtail.blocks import StreamValue
+from wagtail.rich_text import RichText, get_text_for_indexing
+
+from .default_settings import get_setting
+
+# number of characters in the plain text excerpt of a definition
+EXCERPT_LENGTH = 150
+
+# matches the term id of every `<span data-term="...">` created by the term entity
+TERM_ID_RE = re.compile(r"""\bdata-term\s*=\s*["']?(\d+)""")
+
+# matches the opening tag of every term span, with its term id
+TERM_SPAN_RE = re.compile(r"""<span\b[^>]*?\sdata-term\s*=\s*["']?(\d+)["']?[^>]*>""", re.IGNORECASE)
+
+
+def extract_term_ids(html):
+    """
+    Return the set of term ids referenced by `data-term` attributes in a string of html.
+    """
+    if not html:
+        return set()
+    return {int(term_id) for term_id in TERM_ID_RE.findall(str(html))}
+
+
+def extract_term_ids_from_data(value):
+    """
+    Return the set of term ids referenced in every string of a value made of lists, dicts and strings, such as the
+    raw data of a StreamField.
+    """
+    if isinstance(value, str):
+        return extract_term_ids(value)
+    if isinstance(value, dict):
+        value = list(value.values())
+    term_ids = set()
+    if isinstance(value, (list, tuple)):
+        for item in value:
+            term_ids.update(extract_term_ids_from_data(item))
+    return term_ids
+
+
+def get_value_term_ids(value):
+    """
+    Return the set of term ids referenced in a rich text, StreamField or html value. Rich text and StreamField values
+    are read from their stored data, which doesn't render them.
+    """
+    if isinstance(value, StreamValue):
+        return extract_term_ids_from_data(list(value.raw_data))
+    if isinstance(value, RichText):
+        return extract_term_ids(value.source)
+    return extract_term_ids(value)
+
+
+def get_rich_text_fields(model, local=False):
+    """
+    Return the names of the rich text and StreamField fields of a model, or only those in its own table with `local`.
+    """
+    fields = model._meta.local_concrete_fields if local else model._meta.concrete_fields
+    return [field.name for field in fields if isinstance(field, (RichTextField, StreamField))]
+
+
+def get_rich_text_models():
+    """
+    Yield every model with rich text or StreamField columns, with the names of those columns. Fields are only listed
+    for the model whose table they are in, so pages inheriting them aren't read twice.
+    """
+    for model in apps.get_models():
+        if model._meta.proxy:
+            continue
+        fields = get_rich_text_fields(model, local=True)
+        if fields:
+            yield model, fields
+
+
+def get_object_term_ids(instance):
+    """
+    Return the set of term ids linked in the rich text and StreamField fields of an object.
+    """
+    term_ids = set()
+    for name in get_rich_text_fields(type(instance)):
+        field = instance._meta.get_field(name)
+        value = getattr(instance, name)
+        if isinstance(field, StreamField):
+            # the raw data of the blocks, which doesn't render them
+            value = field.get_prep_value(value)
+        term_ids.update(extract_term_ids_from_data(value))
+    return term_ids
+
+
+def get_base_content_type(model):
+    """
+    Return the content type of the top concrete model of a model, e.g. `Page` for every page type, so that an object
+    is found under the same content type whatever its specific type.
+    """
+    parents = model._meta.concrete_model._meta.get_parent_list()
+    return ContentType.objects.get_for_model(parents[-1] if parents else model)
+
+
+def get_definition_text(definition):
+    """
+    Return a rich text definition as plain text, without tags or html entities.
+    """
+    return get_text_for_indexing(definition or "")
+
+
+def get_definition_excerpt(definition):
+    """
+    Return the start of a rich text definition as plain text, shortened to `EXCERPT_LENGTH` characters.
+    """
+    return Truncator(get_definition_text(definition)).chars(EXCERPT_LENGTH)
+
+
+def get_term_attributes(term_id):
+    """
+    Return the attributes of the `<span>` that marks a term in stored html, which has the `style` setting inline or
+    only a class when the `style_mode` setting is 'class'.
+    """
+    if get_setting('style_mode') == 'class':
+        return {"class": get_setting('class_name'), "data-term": str(term_id)}
+    return {"style": get_setting('style'), "data-term": str(term_id)}
+
+
+def get_term_stylesheet():
+    """
+    Return the css that styles term spans in the 'class' style mode.
+    """
+    return f".{get_setting('class_name')} {{ {get_setting('style')} }}\n"
+
+
+def render_term_start_tag(term_id):
+    """
+    Return the opening `<span>` tag of a term, with the attributes in the same order as the editor saves them.
+    """
+    return format_html("<span{}>", format_html_join("", ' {}="{}"', get_term_attributes(term_id).items()))
+
+
+def rewrite_term_spans(html):
+    """
+    Replace the opening tag of every term span in a string of html with the tag for the current style settings.
+    """
+    return TERM_SPAN_RE.sub(lambda match: render_term_start_tag(match.group(1)), html)
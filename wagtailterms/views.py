@@ -2,17 +2,88 @@ from rest_framework.viewsets import ReadOnlyModelViewSet
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import ValidationError
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 from taggit.models import Tag
-from django.db import models
 
-from .models import Term
-from .permissions import CanAccessTags
-from .serializers import TermSerializer
+from .models import TagUsage, Term, TermUsage, WagtailTermTag
+from .permissions import CanAccessTags, CanViewTermUsage
+from .serializers import DEFINITION_MODES, TermSerializer
 
 from .default_settings import get_setting
+from wagtail.admin.admin_url_finder import AdminURLFinder
+from wagtail.models import Page
 from wagtail.search.backends import get_search_backend
 
-from django.http import Http404
+from django.db import models
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, quote_etag
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import etag
+import base64
+import hashlib
+import json
+
+from .autocomplete import get_prefix_index
+from .cache import get_glossary_version
+from .timing import RequestTimer, get_timer
+from .usage import get_usage_objects
+from .utils import get_term_stylesheet
+
+
+def encode_cursor(position):
+    """
+    Return an opaque cursor storing a position in a keyset ordering.
+    """
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+def decode_cursor(cursor, types):
+    """
+    Return the position stored in a cursor as a tuple, or None if the cursor is missing or invalid.
+    `types` are the expected types of the values in the position.
+    """
+    if not cursor:
+        return None
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(position, list) or len(position) != len(types):
+        return None
+    if not all(isinstance(value, type_) for value, type_ in zip(position, types)):
+        return None
+    return tuple(position)
+
+
+def encode_tag_cursor(tag_usage):
+    """
+    Return an opaque cursor pointing after the given tag in the tags endpoint ordering.
+    """
+    return encode_cursor([tag_usage.usage_count, tag_usage.name])
+
+
+def decode_tag_cursor(cursor):
+    """
+    Return the (usage_count, name) position stored in a tags cursor, or None if the cursor is missing or invalid.
+    """
+    return decode_cursor(cursor, (int, str))
+
+
+def encode_term_cursor(term):
+    """
+    Return an opaque cursor pointing after the given term in the (term, id) ordering of the cursor paginated list.
+    """
+    return encode_cursor([term.term, term.id])
+
+
+def decode_term_cursor(cursor):
+    """
+    Return the (term, id) position stored in a terms cursor, or None if the cursor is missing or invalid.
+    """
+    return decode_cursor(cursor, (str, int))
+
+
 class TermPagination(PageNumberPagination):
     page_size = 20
     page_size_query_param = 'page_size'
@@ -29,35 +100,282 @@ class TermPagination(PageNumberPagination):
         })
 
 
+class TermCursorPagination(TermPagination):
+    """
+    Keyset pagination over terms ordered by (term, id). The view filters the queryset to the terms after the cursor,
+    so every page costs the same however deep it is, and the terms are never counted.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        # fetch one extra term to know if there is another page
+        terms = list(queryset[:page_size + 1])
+        self.has_next = len(terms) > page_size
+        self.terms = terms[:page_size]
+        return self.terms
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, 'cursor', encode_term_cursor(self.terms[-1]))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data
+        })
+
+
 class TermViewSet(ReadOnlyModelViewSet):
     serializer_class = TermSerializer
     pagination_class = TermPagination
+    # Maximum number of terms that can be requested at once with the `ids` parameter
+    max_batch_size = 100
+    # Default and maximum number of terms returned by the autocomplete endpoint
+    autocomplete_limit = 10
+    max_autocomplete_limit = 50
+
+    def get_batch_ids(self):
+        """
+        Return the term ids requested with the `ids` query parameter, or None when the list is not a batch lookup.
+        Accepts both a comma separated list (`?ids=1,2,3`) and repeated parameters (`?ids=1&ids=2`).
+        """
+        if self.action != "list" or "ids" not in self.request.query_params:
+            return None
+
+        ids = set()
+        for value in self.request.query_params.getlist("ids"):
+            for term_id in value.split(","):
+                term_id = term_id.strip()
+                if term_id.isdigit():
+                    ids.add(int(term_id))
+
+        if len(ids) > self.max_batch_size:
+            raise ValidationError({"ids": f"A maximum of {self.max_batch_size} terms can be requested at once."})
+        return ids
+
+    def uses_cursor_pagination(self):
+        """
+        Return whether the list is cursor paginated, with `pagination=cursor`, a `cursor` or the `pagination` setting.
+        """
+        if self.action != "list":
+            return False
+        params = self.request.query_params
+        if "cursor" in params:
+            return True
+        return params.get("pagination", get_setting('pagination')) == "cursor"
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            self._paginator = TermCursorPagination() if self.uses_cursor_pagination() else self.pagination_class()
+        return self._paginator
+
+    def paginate_queryset(self, queryset):
+        # batch lookups return every requested term in a single unpaginated response
+        if self.get_batch_ids() is not None:
+            return None
+        return super().paginate_queryset(queryset)
+
+    def get_requested_fields(self):
+        """
+        Return the set of fields requested with the `fields` query parameter (`?fields=id,term`), or None for every
+        field.
+        """
+        fields = self.request.query_params.get("fields")
+        if not fields:
+            return None
+        return {field.strip() for field in fields.split(",") if field.strip()}
+
+    def get_definition_mode(self):
+        """
+        Return how the definition is returned, from the `definition` query parameter. Defaults to the rendered html.
+        """
+        fields = self.get_requested_fields()
+        if fields is not None and "definition" not in fields:
+            return "none"
+        mode = self.request.query_params.get("definition", "full")
+        return mode if mode in DEFINITION_MODES else "full"
+
+    def get_loaded_fields(self):
+        """
+        Return the model fields needed to serialize the requested fields, so the others aren't loaded from the
+        database. The term is always needed for the (term, id) cursor.
+        """
+        fields = ["id", "term"]
+        mode = self.get_definition_mode()
+        if mode in ("full", "text"):
+            # the rendered definition is cached by a digest of the definition, so nothing else is needed for it
+            fields.append("definition")
+        elif mode == "excerpt":
+            fields.append("excerpt")
+        return fields
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["fields"] = self.get_requested_fields()
+        context["definition"] = self.get_definition_mode()
+        return context
+
+    def get_etag(self, request, version):
+        # staff can see terms that aren't live so they get a different response to everyone else
+        key = f"{version}:{request.user.is_staff}:{request.get_full_path()}"
+        return quote_etag(hashlib.md5(key.encode()).hexdigest())
+
+    def conditional_response(self, view, request, *args, **kwargs):
+        """
+        Answer `If-None-Match` requests with 304 Not Modified before querying or serializing any terms, when the
+        glossary hasn't changed since the client's copy was made.
+
+        Only the ETag is used: `Last-Modified` has whole seconds, so changes less than a second apart would get the
+        same date and clients would keep their stale copy.
+        """
+        if not get_setting('conditional_requests'):
+            return view(request, *args, **kwargs)
+
+        etag = self.get_etag(request, get_glossary_version())
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = view(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+
+        response["ETag"] = etag
+        return response
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        # only anonymous responses are the same for everyone, so they are the only ones that can be shared by a CDN
+        cache_control = get_setting('cache_control')
+        if cache_control and response.status_code in (200, 304) and not request.user.is_authenticated:
+            if request.GET and request.GET.get('v') != str(get_glossary_version()):
+                # urls with a query string can't all be purged when a term changes, so shared caches keep them only as
+                # long as browsers do. Urls with the current glossary version in `v` change with the next version, so
+                # they can be kept for the whole s_maxage.
+                cache_control = {**cache_control, 's_maxage': cache_control.get('max_age', 0)}
+            patch_cache_control(response, public=True, **cache_control)
+        return response
+
+    def dispatch(self, request, *args, **kwargs):
+        if not get_setting('server_timing'):
+            return super().dispatch(request, *args, **kwargs)
+
+        timer = RequestTimer()
+        request.wagtailterms_timer = timer
+        with timer.count_queries():
+            response = super().dispatch(request, *args, **kwargs)
+            # not modified responses have nothing to render
+            if hasattr(response, "render"):
+                with timer.phase("render"):
+                    response.render()
+        timer.report(request, response, self.action)
+        return response
+
+    def list_terms(self, request, *args, **kwargs):
+        timer = get_timer(request)
+        # the terms are fetched when the page is sliced, or all at once for batch lookups
+        with timer.phase("search" if request.query_params.get("q") else "db"):
+            queryset = self.filter_queryset(self.get_queryset())
+            page = self.paginate_queryset(queryset)
+            terms = list(queryset) if page is None else page
+        with timer.phase("serialize"):
+            data = self.get_serializer(terms, many=True).data
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+    def retrieve_term(self, request, *args, **kwargs):
+        timer = get_timer(request)
+        with timer.phase("db"):
+            term = self.get_object()
+        with timer.phase("serialize"):
+            data = self.get_serializer(term).data
+        return Response(data)
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(self.list_terms, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(self.retrieve_term, request, *args, **kwargs)
+
+    def get_tagged_term_ids(self, tag_ids):
+        """
+        Return a subquery of the ids of the terms tagged with the given tags.
+
+        With `tag_mode=all` (the default) terms must have every tag, which is checked by grouping the tagged items by
+        term and counting the matched tags, so the query has the same shape however many tags are requested.
+        With `tag_mode=any` terms need at least one of the tags.
+        """
+        tagged_terms = WagtailTermTag.objects.filter(tag_id__in=tag_ids).values("content_object_id")
+        if self.request.query_params.get("tag_mode") != "any":
+            tagged_terms = tagged_terms.annotate(
+                matched_tags=models.Count("tag_id", distinct=True)
+            ).filter(matched_tags=len(tag_ids))
+        return tagged_terms.values("content_object_id")
 
     def get_queryset(self):
         q = self.request.query_params.get("q")
         tags = self.request.query_params.getlist("tags")
 
-        queryset = Term.objects.all()
+        queryset = Term.objects.only(*self.get_loaded_fields())
         if not self.request.user.is_staff:
             queryset = queryset.filter(live=True)
-            
-        tags_objects = []
-        if not get_setting('disable_tags'):
-            # Apply tag filters if provided - require ALL tags to match
-            tags_objects = Tag.objects.filter(name__in=tags)
-        if tags_objects:
-            # Using a loop to filter by each tag can lead to multiple JOINs and may impact performance when many tags
-            # are involved. However, alternative approaches can involve multiple queries and complexity and don't
-            # work with wagtail search. Such as using Q objects or annotations. Also, tag filtering more often than
-            # not will be a small number of tags.
-            for tag in tags_objects:
-                queryset = queryset.filter(tags=tag)
+
+        # every serialized term reads its tags, load them for the whole page in one query
+        fields = self.get_requested_fields()
+        if not get_setting('disable_tags') and (fields is None or "tags" in fields):
+            queryset = queryset.prefetch_related("tags")
+
+        batch_ids = self.get_batch_ids()
+        if batch_ids is not None:
+            queryset = queryset.filter(id__in=batch_ids)
+
+        if tags and not get_setting('disable_tags'):
+            tag_ids = list(Tag.objects.filter(name__in=tags).values_list("id", flat=True))
+            if tag_ids:
+                queryset = queryset.filter(id__in=self.get_tagged_term_ids(tag_ids))
+
+        if self.uses_cursor_pagination() and batch_ids is None:
+            queryset = queryset.order_by("term", "id")
+            cursor = decode_term_cursor(self.request.query_params.get("cursor"))
+            if cursor:
+                term, term_id = cursor
+                queryset = queryset.filter(models.Q(term__gt=term) | models.Q(term=term, id__gt=term_id))
+            if q:
+                # search results keep the (term, id) order so that the cursor can continue from the last result
+                return get_search_backend().search(q, queryset, operator="or", order_by_relevance=False)
+            return queryset
 
         # Apply search if provided
         if q:
             queryset = get_search_backend().search(q, queryset,operator="or")
         return queryset
 
+    @action(detail=False, methods=['get'])
+    def autocomplete(self, request):
+        """
+        Return the live terms with a word starting with `q` from the in-memory prefix index.
+        Queries that don't match the start of any term, like free text, fall back to the search backend.
+        """
+        q = request.query_params.get("q", "")
+        try:
+            limit = max(1, min(int(request.query_params.get("limit", self.autocomplete_limit)), self.max_autocomplete_limit))
+        except ValueError:
+            limit = self.autocomplete_limit
+
+        results = get_prefix_index().search(q, limit)
+        if not results and q.strip():
+            terms = get_search_backend().search(q, Term.objects.filter(live=True), operator="or")[:limit]
+            results = [(term.id, term.term) for term in terms]
+
+        return Response({
+            'results': [{"id": term_id, "term": name} for term_id, name in results],
+        })
+
     @action(detail=False, methods=['get'])
     def tags(self, request):
         if get_setting('disable_tags'):
@@ -72,32 +390,72 @@ class TermViewSet(ReadOnlyModelViewSet):
             )
         
         
-        try:
-            page = int(request.query_params.get('page', 1))
-            if page < 1: # Ensure page is not negative or zero
-                page = 1
-        except ValueError:
-            page = 1  # Default to page 1 if input is invalid
         page_size = 50  # Number of tags per page
-        
-        # Get all unique tags from live terms, ordered by usage count
-        tags = Tag.objects.filter(
-            wagtailterms_wagtailtermtag_items__content_object__live=True
-        ).annotate(
-            usage_count=models.Count('wagtailterms_wagtailtermtag_items')
-        ).order_by('-usage_count')
-
-        # Apply pagination
-        start = (page - 1) * page_size
-        end = start + page_size
-        paginated_tags = tags[start:end]
-        has_more = tags.count() > end
-        
+
+        # Get all tags used by live terms, ordered by usage count. The counts are kept up to date by signal handlers.
+        # Tags with the same count are ordered by name so that every tag has a stable position between requests.
+        tags = TagUsage.objects.filter(usage_count__gt=0).order_by('-usage_count', 'name')
+
+        cursor = decode_tag_cursor(request.query_params.get('cursor'))
+        if cursor:
+            # keyset pagination: continue after the last tag of the previous page, which costs the same on any page
+            usage_count, name = cursor
+            tags = tags.filter(models.Q(usage_count__lt=usage_count) | models.Q(usage_count=usage_count, name__gt=name))
+        else:
+            # offset pagination is still supported for clients using the page parameter
+            try:
+                page = int(request.query_params.get('page', 1))
+                if page < 1: # Ensure page is not negative or zero
+                    page = 1
+            except ValueError:
+                page = 1  # Default to page 1 if input is invalid
+            start = (page - 1) * page_size
+            tags = tags[start:]
+
+        # fetch one extra tag to know if there is another page without counting all the tags
+        paginated_tags = list(tags[:page_size + 1])
+        has_more = len(paginated_tags) > page_size
+        paginated_tags = paginated_tags[:page_size]
+
         # Return tags with their counts and pagination info
         return Response({
             'tags': [
                 {"name": tag.name, "count": tag.usage_count} 
                 for tag in paginated_tags
             ],
-            'hasMore': has_more
+            'hasMore': has_more,
+            'next': encode_tag_cursor(paginated_tags[-1]) if has_more else None,
         })
+
+    @action(detail=True, methods=['get'])
+    def usage(self, request, pk=None):
+        """
+        Return the live pages and snippets that link the term, from the term usage index.
+        """
+        permission_checker = CanViewTermUsage()
+        if not permission_checker.has_permission(request, self):
+            return Response({"error": permission_checker.message}, status=403)
+
+        term = self.get_object()
+        usages = TermUsage.objects.filter(term=term).select_related("content_type").order_by("id")
+        page = self.paginate_queryset(usages)
+        url_finder = AdminURLFinder(request.user)
+        results = []
+        for usage, obj in zip(page, get_usage_objects(page)):
+            results.append({
+                "type": f"{usage.content_type.app_label}.{usage.content_type.model}",
+                "id": usage.object_id,
+                "title": str(obj) if obj is not None else None,
+                "url": obj.get_url(request) if isinstance(obj, Page) else None,
+                "admin_url": url_finder.get_edit_url(obj) if obj is not None else None,
+            })
+        return self.get_paginated_response(results)
+
+
+@cache_control(public=True, max_age=60 * 60)
+@etag(lambda request: hashlib.md5(get_term_stylesheet().encode()).hexdigest())
+def stylesheet(request):
+    """
+    Serve the style of the term spans saved in the 'class' style mode.
+    """
+    return HttpResponse(get_term_stylesheet(), content_type="text/css")
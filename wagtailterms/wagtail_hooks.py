@@ -3,6 +3,7 @@ from wagtail import hooks
 from draftjs_exporter.dom import DOM
 import wagtail.admin.rich_text.editors.draftail.features as draftail_features
 from wagtail.admin.panels import FieldPanel
+from wagtail.admin.rich_text.converters.contentstate_models import Entity
 from wagtail.admin.rich_text.converters.html_to_contentstate import (
     InlineEntityElementHandler,
 )
@@ -11,16 +12,19 @@ from wagtail.snippets.models import register_snippet
 from wagtail.snippets.views.snippets import SnippetViewSet
 from .default_settings import get_setting
 from .models import Term
+from .utils import get_term_attributes
+from .views import TermViewSet as TermAPIViewSet
 
 TERM_ICON = get_setting('icon')
 
 
 @hooks.register("insert_editor_js")
 def editor_js():
-    # add the path to the terms list view to the javascript so that the url can be set dynamically for the terms api
+    # add the path to the terms list view to the javascript so that the url can be set dynamically for the terms api,
+    # with the most terms its batch lookup returns at once
     path_to_term = reverse("wagtailterms:terms-list")
     wagtail_term_styles = get_setting('style')
-    return mark_safe(f'<script>const WAGTAIL_TERM_PATH = "{path_to_term}"; const WAGTAIL_TERM_STYLE = "{wagtail_term_styles}"; const WAGTAIL_TERM_DISABLE_TAGS = {"true" if get_setting("disable_tags") else "false"};</script>')
+    return mark_safe(f'<script>const WAGTAIL_TERM_PATH = "{path_to_term}"; const WAGTAIL_TERM_STYLE = "{wagtail_term_styles}"; const WAGTAIL_TERM_DISABLE_TAGS = {"true" if get_setting("disable_tags") else "false"}; const WAGTAIL_TERM_BATCH_SIZE = {TermAPIViewSet.max_batch_size};</script>')
 
 
 @hooks.register("register_rich_text_features")
@@ -70,14 +74,58 @@ def term_entity_decorator(props):
     Draft.js ContentState to database HTML.
     Converts the TERM entities into a span tag.
     """
-    return DOM.create_element(
-        "span",
-        {
-            "style": get_setting('style'),
-            "data-term": props["term"]["id"],
-        },
-        props["children"],
-    )
+    return DOM.create_element("span", get_term_attributes(props["term"]["id"]), props["children"])
+
+
+class TermBatchLoader:
+    """
+    Loads the names of the terms referenced by a single html to contentstate conversion.
+    Every term id found in the document is fetched together the first time any of them is needed,
+    and repeated ids share the same data.
+    The definitions and tags are fetched by the editor from the terms api when a term is first hovered,
+    so they don't make the contentstate of long pages any bigger.
+    """
+
+    def __init__(self):
+        self.pending_ids = set()
+        self.terms = {}
+
+    def add(self, term_id):
+        if term_id not in self.terms:
+            self.pending_ids.add(term_id)
+
+    def load(self):
+        term_ids = {int(term_id) for term_id in self.pending_ids if str(term_id).isdigit()}
+        loaded = {str(term_id): name for term_id, name in Term.objects.filter(id__in=term_ids).values_list("id", "term")}
+        for term_id in self.pending_ids:
+            self.terms[term_id] = loaded.get(str(term_id))
+        self.pending_ids.clear()
+
+    def get_attribute_data(self, term_id):
+        if self.pending_ids:
+            self.load()
+        name = self.terms.get(term_id)
+        if name is None:
+            # the editor shows that the term might be deleted for id 0
+            return {"term": {"term": "Term Not Found", "id": 0}}
+        return {"term": {"term": name, "id": int(term_id)}}
+
+
+class TermEntity(Entity):
+    """
+    A TERM entity whose data is filled in by the batch loader when the contentstate is serialised,
+    by which point every term in the document has been seen.
+    """
+
+    def __init__(self, entity, term_id, loader):
+        super().__init__(entity.entity_type, entity.mutability, entity.data)
+        self.term_id = term_id
+        self.loader = loader
+        loader.add(term_id)
+
+    def as_dict(self):
+        self.data = self.loader.get_attribute_data(self.term_id)
+        return super().as_dict()
 
 
 class TermEntityElementHandler(InlineEntityElementHandler):
@@ -88,29 +136,24 @@ class TermEntityElementHandler(InlineEntityElementHandler):
 
     mutability = "MUTABLE"
 
+    def handle_starttag(self, name, attrs, state, contentstate):
+        super().handle_starttag(name, attrs, state, contentstate)
+
+        # the handler state is reset for every conversion so the loader is shared by all the terms in one document
+        if not hasattr(state, "term_loader"):
+            state.term_loader = TermBatchLoader()
+
+        # replace the entity that was just created with one that is loaded together with the rest of the terms
+        key = state.current_entity_ranges[-1].key
+        entity = contentstate.entity_map[key]
+        contentstate.entity_map[key] = TermEntity(entity, entity.data["term"]["id"], state.term_loader)
+
     def get_attribute_data(self, attrs):
         """
-        Take the `term` value from the `data-term` HTML attribute.
+        Take the `term` id from the `data-term` HTML attribute.
+        The rest of the term is filled in by `TermEntity` once all the terms in the document are known.
         """
-        try:
-            term = Term.objects.get(id=attrs["data-term"])
-            return {
-                "term": {
-                    "term": term.term,
-                    "definition": term.definition,
-                    "id": term.id,
-                    "tags": [] if get_setting("disable_tags") else list(term.tags.names()),
-                }
-            }
-        except Term.DoesNotExist:
-            return {
-                "term": {
-                    "term": "<span style='color:red'>Term Not Found</span>",
-                    "definition": "<i>This term might be deleted</i>",
-                    "id": 0,
-                    "tags": [],
-                }
-            }
+        return {"term": {"id": attrs.get("data-term")}}
 
 
 class TermViewSet(SnippetViewSet):